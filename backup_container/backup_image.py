@@ -1,4 +1,11 @@
 #!/usr/bin/env python3
+import asyncio
+import gzip
+import hashlib
+import logging
+import logging.handlers
+import os
+import shutil
 import subprocess
 from datetime import datetime
 from pathlib import Path
@@ -8,41 +15,131 @@ CONTAINERS = ["ukm_mininet", "ukm_ryu"]
 IMAGE = "localhost/ukm-ubuntu:24.04-updated"
 NETWORKS = ["ukmsdn-network"]
 
+log = logging.getLogger(__name__)
+
+def configure_logging():
+    """Buffer log records and flush them in batches to limit stdout syscalls."""
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    buffered = logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.ERROR,
+                                              target=stream)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(buffered)
+
+def flush_logs():
+    """Flush buffered log output at a phase boundary."""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
 def run_command(cmd):
-    print(f"[INFO] Running: {' '.join(cmd)}")
+    log.info(f"[INFO] Running: {' '.join(cmd)}")
     subprocess.run(cmd, check=True)
 
+async def run_capture(cmd, outfile):
+    """Run a command asynchronously with stdout redirected to a file."""
+    log.info(f"[INFO] Running: {' '.join(cmd)} > {outfile}")
+    with open(outfile, "wb", buffering=2 * 1024 * 1024) as f:
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=f)
+        returncode = await proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+class _HashingWriter:
+    """File wrapper that updates a digest with every write."""
+
+    def __init__(self, fileobj, digest):
+        self._fileobj = fileobj
+        self._digest = digest
+
+    def write(self, data):
+        self._digest.update(data)
+        return self._fileobj.write(data)
+
+def _image_size_estimate():
+    """Upper bound (in bytes) for the saved image archive, with ~5% slack."""
+    result = subprocess.run(["podman", "image", "inspect", "--format", "{{.Size}}", IMAGE],
+                            capture_output=True, text=True)
+    size = result.stdout.strip()
+    if result.returncode == 0 and size.isdigit():
+        return int(int(size) * 1.05)
+    return 0
+
 def backup_image():
-    """Backup updated image only."""
+    """Backup updated image only, compressing the tar stream inline."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    image_file = BACKUP_DIR / f"ukm-ubuntu_{timestamp}.tar"
-    print(f"[INFO] Saving image to {image_file}")
-    run_command(["podman", "save", "-o", str(image_file), IMAGE])
+    image_file = BACKUP_DIR / f"ukm-ubuntu_{timestamp}.tar.gz"
+    log.info(f"[INFO] Saving image to {image_file}")
+    # Stream podman save straight through gzip so the uncompressed tar
+    # never hits the disk, hashing the compressed bytes as they are
+    # written so restore can verify without a separate read pass.
+    sha256 = hashlib.sha256()
+    proc = subprocess.Popen(["podman", "save", IMAGE], stdout=subprocess.PIPE,
+                            bufsize=1024 * 1024)
+    expected_size = _image_size_estimate()
+    with open(image_file, "wb", buffering=2 * 1024 * 1024) as f:
+        if expected_size:
+            # Pre-size the destination so the filesystem allocates
+            # extents up front instead of growing the file write by write.
+            try:
+                os.posix_fallocate(f.fileno(), 0, expected_size)
+            except OSError:
+                pass
+        with gzip.GzipFile(fileobj=_HashingWriter(f, sha256), mode="wb",
+                           compresslevel=1) as gz:
+            shutil.copyfileobj(proc.stdout, gz, length=2 * 1024 * 1024)
+        # Trim the preallocation back to the compressed length.
+        f.truncate()
+    proc.stdout.close()
+    returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, ["podman", "save", IMAGE])
+    sha_file = Path(f"{image_file}.sha256")
+    sha_file.write_text(f"{sha256.hexdigest()}  {image_file.name}\n")
+    log.info(f"[INFO] Wrote checksum to {sha_file}")
 
-def backup_containers():
-    """Backup container metadata only."""
+async def backup_containers():
+    """Backup container metadata only, inspecting all containers in parallel."""
+    tasks = []
     for cname in CONTAINERS:
-        meta_file = BACKUP_DIR / f"{cname}_metadata.json"
-        print(f"[INFO] Saving metadata for {cname}")
-        run_command(["podman", "inspect", cname, "-f", "json"])
-        with open(meta_file, "w") as f:
-            subprocess.run(["podman", "inspect", cname], stdout=f, check=True)
-
-def backup_networks():
-    """Backup networks."""
-    for net in NETWORKS:
-        net_file = BACKUP_DIR / f"{net}_network.json"
-        print(f"[INFO] Saving network {net}")
-        with open(net_file, "w") as f:
-            subprocess.run(["podman", "network", "inspect", net], stdout=f, check=True)
+        tasks.append(run_capture(["podman", "inspect", cname],
+                                 BACKUP_DIR / f"{cname}_metadata.json"))
+        # Tiny sidecar holding just the fields restore needs, so it does
+        # not have to parse the full metadata blob.
+        tasks.append(run_capture(
+            ["podman", "inspect", cname, "-f", "{{.ImageName}}|{{json .Config.Cmd}}"],
+            BACKUP_DIR / f"{cname}_summary.txt"))
+    await asyncio.gather(*tasks)
 
-def main():
+async def backup_networks():
+    """Backup networks, inspecting all networks in parallel."""
+    tasks = [
+        run_capture(["podman", "network", "inspect", net], BACKUP_DIR / f"{net}_network.json")
+        for net in NETWORKS
+    ]
+    await asyncio.gather(*tasks)
+
+def _sync_backup_dir():
+    """Flush the backup directory once for the whole backup set."""
+    dir_fd = os.open(BACKUP_DIR, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+async def main_async():
     BACKUP_DIR.mkdir(exist_ok=True)
     backup_image()
-    backup_containers()
-    backup_networks()
-    print("[SUCCESS] Backup completed successfully!")
+    flush_logs()
+    await backup_containers()
+    await backup_networks()
+    _sync_backup_dir()
+    log.info("[SUCCESS] Backup completed successfully!")
+    flush_logs()
+
+def main():
+    configure_logging()
+    asyncio.run(main_async())
 
 if __name__ == "__main__":
     main()
-
@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
+import hashlib
+import logging
+import logging.handlers
 import subprocess
 import json
+import zlib
 from pathlib import Path
 from datetime import datetime
 
@@ -11,65 +15,109 @@ IMAGE_TAG = "24.04-updated"      # Your updated image tag
 CONTAINERS = ["ukm_mininet", "ukm_ryu"]
 NETWORKS = ["ukmsdn-network"]
 
+log = logging.getLogger(__name__)
+
+def configure_logging():
+    """Buffer log records and flush them in batches to limit stdout syscalls."""
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    buffered = logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.ERROR,
+                                              target=stream)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(buffered)
+
+def flush_logs():
+    """Flush buffered log output at a phase boundary."""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
 # === HELPER FUNCTIONS ===
 def run_command(cmd, capture_output=False):
     """Run shell command safely."""
-    print(f"[INFO] Running: {' '.join(cmd)}")
+    log.info(f"[INFO] Running: {' '.join(cmd)}")
     try:
         result = subprocess.run(cmd, check=True, text=True,
                                 capture_output=capture_output)
         return result.stdout if capture_output else None
     except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Command failed: {' '.join(cmd)}")
-        print(e.stderr)
+        log.error(f"[ERROR] Command failed: {' '.join(cmd)}")
+        log.info(e.stderr)
         raise
 
 def find_latest_backup(prefix):
-    """Find the latest backup tar file for given image prefix."""
-    backups = sorted(BACKUP_DIR.glob(f"{prefix}_*.tar"))
+    """Find the latest backup archive for given image prefix."""
+    backups = sorted(BACKUP_DIR.glob(f"{prefix}_*.tar.gz"))
     return backups[-1] if backups else None
 
 # === RESTORE FUNCTIONS ===
 def restore_image():
     """Restore the latest saved image from TAR."""
-    print("\n[STEP] Restoring image...")
+    log.info("\n[STEP] Restoring image...")
     image_file = find_latest_backup(IMAGE_PREFIX)
     if not image_file:
-        print(f"[ERROR] No image backup found in {BACKUP_DIR}")
+        log.error(f"[ERROR] No image backup found in {BACKUP_DIR}")
         return False
 
-    print(f"[INFO] Loading image from {image_file}")
-    run_command(["podman", "load", "-i", str(image_file)])
+    sha_file = Path(f"{image_file}.sha256")
+    expected_digest = None
+    if sha_file.exists():
+        expected_digest = sha_file.read_text().split()[0]
+    else:
+        log.warning(f"[WARNING] No checksum file {sha_file}, skipping verification")
+
+    log.info(f"[INFO] Loading image from {image_file}")
+    # Verify the checksum and decompress in a single read pass, piping
+    # the tar stream straight into podman load.
+    sha256 = hashlib.sha256()
+    decompressor = zlib.decompressobj(wbits=31)  # gzip container
+    proc = subprocess.Popen(["podman", "load"], stdin=subprocess.PIPE,
+                            bufsize=1024 * 1024)
+    try:
+        with open(image_file, "rb", buffering=2 * 1024 * 1024) as f:
+            while chunk := f.read(2 * 1024 * 1024):
+                sha256.update(chunk)
+                proc.stdin.write(decompressor.decompress(chunk))
+            proc.stdin.write(decompressor.flush())
+    except zlib.error as e:
+        proc.stdin.close()
+        proc.wait()
+        log.error(f"[ERROR] Failed to decompress {image_file}: {e} - backup may be corrupted")
+        return False
+    proc.stdin.close()
+    if proc.wait() != 0:
+        log.error(f"[ERROR] podman load failed for {image_file}")
+        return False
+    if expected_digest and sha256.hexdigest() != expected_digest:
+        log.error(f"[ERROR] Checksum mismatch for {image_file} - backup may be corrupted")
+        return False
     return True
 
 def restore_networks():
     """Restore Podman networks from JSON backup safely."""
-    print("\n[STEP] Restoring networks...")
+    log.info("\n[STEP] Restoring networks...")
 
-    # Get existing networks
+    # Get existing network names only - no need to parse full JSON
     try:
-        result = run_command(["podman", "network", "ls", "--format", "json"], capture_output=True)
-        existing_nets = json.loads(result) if result else []
+        result = run_command(["podman", "network", "ls", "--format", "{{.Name}}"], capture_output=True)
+        existing_net_names = set(result.splitlines()) if result else set()
     except subprocess.CalledProcessError:
-        existing_nets = []
-
-    # Extract existing network names
-    existing_net_names = {net.get("Name") or net.get("name") for net in existing_nets if isinstance(net, dict)}
+        existing_net_names = set()
 
     for net_name in NETWORKS:
         net_file = BACKUP_DIR / f"{net_name}_network.json"
         if not net_file.exists():
-            print(f"[WARNING] Network backup file '{net_file}' not found. Skipping.")
+            log.warning(f"[WARNING] Network backup file '{net_file}' not found. Skipping.")
             continue
 
-        print(f"[INFO] Restoring network '{net_name}' from {net_file}")
+        log.info(f"[INFO] Restoring network '{net_name}' from {net_file}")
 
         # Load network config
         with open(net_file, "r") as f:
             try:
                 network_config = json.load(f)
             except json.JSONDecodeError:
-                print(f"[ERROR] Failed to read network backup file {net_file}")
+                log.error(f"[ERROR] Failed to read network backup file {net_file}")
                 continue
 
         # network_config is a list, take the first dict
@@ -86,7 +134,7 @@ def restore_networks():
 
         # Remove existing network if exists
         if net_name in existing_net_names:
-            print(f"[INFO] Removing existing network '{net_name}'")
+            log.info(f"[INFO] Removing existing network '{net_name}'")
             run_command(["podman", "network", "rm", net_name])
 
         # Build create command
@@ -97,53 +145,95 @@ def restore_networks():
             cmd += ["--gateway", gateway]
 
         run_command(cmd)
-        print(f"[SUCCESS] Network '{net_name}' restored.")
+        log.info(f"[SUCCESS] Network '{net_name}' restored.")
+
+def _container_content_hash(image, cmd):
+    """Content hash of the container settings restore would recreate."""
+    payload = {"image": image, "cmd": cmd, "net": NETWORKS[0]}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def _live_container_hash(cname):
+    """Content hash of a running container, or None if it cannot be read."""
+    try:
+        raw = run_command(["podman", "inspect", cname, "-f",
+                           "{{.ImageName}}|{{json .Config.Cmd}}"], capture_output=True)
+    except subprocess.CalledProcessError:
+        return None
+    if not raw:
+        return None
+    image, _, cmd_part = raw.strip().partition("|")
+    cmd = json.loads(cmd_part) if cmd_part and cmd_part != "null" else None
+    cmd = cmd or ["/opt/ukmsdn/scripts/start_ovs.sh"]
+    return _container_content_hash(image, cmd)
 
 def restore_containers():
     """Recreate containers from metadata."""
-    print("\n[STEP] Restoring containers...")
+    log.info("\n[STEP] Restoring containers...")
+
+    # Query the existing container names once up front instead of
+    # re-running podman ps for every name in the loop.
+    existing = run_command(["podman", "ps", "-a", "--format", "{{.Names}}"], capture_output=True)
+    existing_names = set(existing.splitlines()) if existing else set()
+
     for cname in CONTAINERS:
         meta_file = BACKUP_DIR / f"{cname}_metadata.json"
         if not meta_file.exists():
-            print(f"[WARNING] Metadata for {cname} not found, skipping.")
+            log.warning(f"[WARNING] Metadata for {cname} not found, skipping.")
             continue
 
-        # Stop and remove container if it exists
-        existing = run_command(["podman", "ps", "-a", "--format", "json"], capture_output=True)
-        existing = json.loads(existing)
-
-        if any(c["Names"][0] == cname for c in existing):
-            print(f"[INFO] Removing existing container '{cname}'")
+        # Prefer the small summary sidecar over parsing the full
+        # metadata blob just to pull two fields out of it.
+        image = cmd = None
+        summary_file = BACKUP_DIR / f"{cname}_summary.txt"
+        if summary_file.exists():
+            image_part, _, cmd_part = summary_file.read_text().strip().partition("|")
+            if image_part:
+                image = image_part
+                cmd = json.loads(cmd_part) if cmd_part and cmd_part != "null" else None
+
+        if image is None:
+            # Fall back to the full metadata from older backups
+            with open(meta_file, "r") as f:
+                metadata = json.load(f)
+            image = metadata[0]["ImageName"]
+            cmd = metadata[0]["Config"]["Cmd"]
+
+        cmd = cmd or ["/opt/ukmsdn/scripts/start_ovs.sh"]
+
+        # Skip the rm/run cycle when the live container was already
+        # created from the same image and command.
+        want = _container_content_hash(image, cmd)
+        if cname in existing_names:
+            if want == _live_container_hash(cname):
+                log.info(f"[SKIP] Container '{cname}' unchanged, keeping existing container.")
+                continue
+            log.info(f"[INFO] Removing existing container '{cname}'")
             run_command(["podman", "rm", "-f", cname])
 
-        # Load metadata
-        with open(meta_file, "r") as f:
-            metadata = json.load(f)
-
-        # Extract key info
-        image = metadata[0]["ImageName"]
-        cmd = metadata[0]["Config"]["Cmd"] or ["/opt/ukmsdn/scripts/start_ovs.sh"]
-
         # Recreate container
-        print(f"[INFO] Recreating container '{cname}' with image '{image}'")
+        log.info(f"[INFO] Recreating container '{cname}' with image '{image}'")
         run_command(["podman", "run", "-d", "--name", cname, "--network", NETWORKS[0], image] + cmd)
 
-        print(f"[SUCCESS] Container '{cname}' restored and running.")
+        log.info(f"[SUCCESS] Container '{cname}' restored and running.")
 
 # === MAIN ===
 def main():
-    print("=== Podman Restore Script ===")
+    configure_logging()
+    log.info("=== Podman Restore Script ===")
     BACKUP_DIR.mkdir(exist_ok=True)
 
     if not restore_image():
-        print("[ERROR] Failed to restore image. Aborting.")
+        log.error("[ERROR] Failed to restore image. Aborting.")
         return
+    flush_logs()
 
     restore_networks()
+    flush_logs()
     restore_containers()
 
-    print("\n[SUCCESS] Restore completed successfully!")
-    print("[INFO] Verify with: podman ps")
+    log.info("\n[SUCCESS] Restore completed successfully!")
+    log.info("[INFO] Verify with: podman ps")
+    flush_logs()
 
 if __name__ == "__main__":
     main()
@@ -99,95 +99,194 @@ MONITORING ENDPOINTS (when REST API is active):
 - curl http://<controller-ip>:8080/stats
 """
 
+import asyncio
+import hashlib
+import os
 import subprocess
 import sys
+import tarfile
+import threading
 import time
 
-def run_command(cmd, timeout=30):
-    """Run command with timeout"""
+def run_command(cmd, timeout=30, capture=False):
+    """Run command (argv list, no shell) with timeout.
+
+    stdout is only collected when capture=True; stderr is always kept
+    for error reporting.
+    """
     try:
-        result = subprocess.run(cmd, shell=True, timeout=timeout,
-                              capture_output=True, text=True)
-        return result.returncode == 0, result.stdout, result.stderr
+        result = subprocess.run(
+            cmd, timeout=timeout, text=True,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.PIPE)
+        return result.returncode == 0, result.stdout or "", result.stderr
     except subprocess.TimeoutExpired:
         return False, "", "Command timed out"
 
+class ContainerShell:
+    """Long-lived `podman exec -i bash` session for one container.
+
+    Keeps a single podman/conmon process alive and feeds it commands over
+    stdin, so the per-invocation podman startup and storage-lock cost is
+    paid once instead of once per command.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self.proc = subprocess.Popen(
+            ["podman", "exec", "-i", container, "bash", "-s"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, bufsize=1)
+        self._seq = 0
+
+    def run(self, command, timeout=30):
+        """Run one shell command; return (success, output).
+
+        A watchdog kills the whole session if the command does not
+        finish within timeout seconds - a hung in-container command must
+        not hang the host script.
+        """
+        self._seq += 1
+        marker = f"__UKMSDN_RC_{self._seq}__"
+        try:
+            self.proc.stdin.write(f"{command}\necho {marker} $?\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return False, ""
+        watchdog = threading.Timer(timeout, self.proc.kill)
+        watchdog.start()
+        lines = []
+        try:
+            while True:
+                line = self.proc.stdout.readline()
+                if not line:  # session died (or watchdog fired)
+                    return False, "".join(lines)
+                if line.startswith(marker):
+                    returncode = int(line.split()[1])
+                    return returncode == 0, "".join(lines)
+                lines.append(line)
+        finally:
+            watchdog.cancel()
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+
+# Cached controller IP - the address cannot change while the script runs,
+# so one podman inspect is enough
+_controller_ip = None
+
 def get_controller_ip():
     """Get the dynamic IP address of the Ryu controller container"""
-    cmd = "podman inspect ukm_ryu --format '{{range .NetworkSettings.Networks}}{{.IPAddress}}{{end}}'"
-    success, stdout, stderr = run_command(cmd)
+    global _controller_ip
+    if _controller_ip:
+        return _controller_ip
+    cmd = ["podman", "inspect", "ukm_ryu", "--format",
+           "{{range .NetworkSettings.Networks}}{{.IPAddress}}{{end}}"]
+    success, stdout, stderr = run_command(cmd, capture=True)
     if success and stdout.strip():
-        return stdout.strip()
+        _controller_ip = stdout.strip()
+        return _controller_ip
     return None
 
-def setup_environment():
-    """Setup and clean environment before testing"""
-    print("🧹 Preparing Environment for 4-Internetwork Topology")
-    print("==================================================")
-
-    # Step 1: Clean up any existing Mininet processes and interfaces
-    print("1. Cleaning up existing Mininet processes...")
-    cleanup_cmd = 'podman exec ukm_mininet mn -c'
-    success, stdout, stderr = run_command(cleanup_cmd)
-    if success:
-        print("   ✅ Mininet cleanup completed")
-    else:
-        print("   ⚠️  Mininet cleanup had warnings (normal)")
-
-    # Step 2: Restart OpenVSwitch service
-    print("2. Restarting OpenVSwitch service...")
-    ovs_cmd = 'podman exec ukm_mininet /opt/ukmsdn/scripts/start_ovs.sh'
-    success, stdout, stderr = run_command(ovs_cmd, timeout=60)
-    output = stdout + stderr
-    if success and ("OpenVSwitch is ready for use" in output or "OpenVSwitch started successfully" in output):
-        print("   ✅ OpenVSwitch service restarted successfully")
-    else:
+def _setup_mininet_environment():
+    """Clean up Mininet state and restart OpenVSwitch in ukm_mininet"""
+    shell = ContainerShell("ukm_mininet")
+    try:
+        # Step 1: Clean up any existing Mininet processes and interfaces
+        print("1. Cleaning up existing Mininet processes...")
+        success, output = shell.run("mn -c")
+        if success:
+            print("   ✅ Mininet cleanup completed")
+        else:
+            print("   ⚠️  Mininet cleanup had warnings (normal)")
+
+        # Step 2: Restart OpenVSwitch service
+        print("2. Restarting OpenVSwitch service...")
+        success, output = shell.run("/opt/ukmsdn/scripts/start_ovs.sh", timeout=60)
+        if success and ("OpenVSwitch is ready for use" in output or "OpenVSwitch started successfully" in output):
+            print("   ✅ OpenVSwitch service restarted successfully")
+            return True
         print("   ❌ OpenVSwitch restart failed")
-        print("   Error:", stderr[-300:] if stderr else "Unknown error")
+        print("   Error:", output[-300:] if output else "Unknown error")
         return False
-
+    finally:
+        shell.close()
+
+def wait_until(check_fn, timeout=20.0):
+    """Poll check_fn with exponential backoff until it succeeds or times out"""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        if check_fn():
+            return True
+        time.sleep(delay)
+        delay = min(delay * 1.7, 0.5)
+    return False
+
+def _stream_apps_to_ryu(local_files):
+    """Deposit controller files into ukm_ryu with a single gzipped tar stream"""
+    proc = subprocess.Popen(
+        ["podman", "exec", "-i", "ukm_ryu", "tar", "-C",
+         "/opt/ukmsdn/examples/ryu", "-xzf", "-"],
+        stdin=subprocess.PIPE)
+    with tarfile.open(fileobj=proc.stdin, mode="w|gz", bufsize=2 * 1024 * 1024) as tar:
+        for local_file in local_files:
+            tar.add(local_file, arcname=os.path.basename(local_file))
+    proc.stdin.close()
+    return proc.wait() == 0
+
+def _setup_ryu_environment():
+    """Deploy the L3 router and fallback controller files into ukm_ryu"""
     # Step 3: Setup custom Ryu L3 router files
     print("3. Setting up custom Ryu L3 router controller...")
 
-    # Check and copy required Ryu files
     target_l3_file = "/opt/ukmsdn/examples/ryu/ryu_l3_router_app.py"
     target_simple_file = "/opt/ukmsdn/examples/ryu/simple_switch_13.py"
 
-    # Create directory structure first
-    mkdir_cmd = 'podman exec ukm_ryu mkdir -p /opt/ukmsdn/examples/ryu'
-    success, stdout, stderr = run_command(mkdir_cmd)
-    if not success:
-        print(f"   ❌ Failed to create directory: {stderr}")
-        return False
-
-    # Copy L3 router app
-    check_l3_cmd = f'podman exec ukm_ryu test -f {target_l3_file}'
-    l3_exists, _, _ = run_command(check_l3_cmd)
-
-    if not l3_exists:
-        print("   📂 Copying L3 router application...")
-        copy_l3_cmd = f'podman cp examples/ryu/ryu_l3_router_app.py ukm_ryu:{target_l3_file}'
-        success, stdout, stderr = run_command(copy_l3_cmd)
+    shell = ContainerShell("ukm_ryu")
+    try:
+        # One shell round-trip covers the mkdir and both existence probes
+        probe_cmd = ("mkdir -p /opt/ukmsdn/examples/ryu && "
+                     f"([ -f {target_l3_file} ] && echo L3_OK || echo L3_MISS); "
+                     f"([ -f {target_simple_file} ] && echo SS_OK || echo SS_MISS)")
+        success, output = shell.run(probe_cmd)
         if not success:
-            print(f"   ❌ Failed to copy L3 router app: {stderr}")
+            print(f"   ❌ Failed to create directory: {output}")
             return False
-        print("   ✅ L3 router application copied successfully")
-
-    # Copy simple_switch_13.py as fallback
-    check_simple_cmd = f'podman exec ukm_ryu test -f {target_simple_file}'
-    simple_exists, _, _ = run_command(check_simple_cmd)
-
-    if not simple_exists:
-        print("   📂 Copying fallback simple_switch_13.py...")
-        copy_simple_cmd = f'podman cp examples/ryu/simple_switch_13.py ukm_ryu:{target_simple_file}'
-        success, stdout, stderr = run_command(copy_simple_cmd)
-        if not success:
-            print(f"   ❌ Failed to copy simple switch: {stderr}")
+    finally:
+        shell.close()
+
+    # Ship any missing files in one tar stream (one podman exec, one
+    # storage-lock acquisition) instead of a podman cp per file
+    missing = []
+    if "L3_MISS" in output:
+        missing.append("examples/ryu/ryu_l3_router_app.py")
+    if "SS_MISS" in output:
+        missing.append("examples/ryu/simple_switch_13.py")
+    if missing:
+        print(f"   📂 Copying {len(missing)} controller file(s) into ukm_ryu...")
+        if not _stream_apps_to_ryu(missing):
+            print("   ❌ Failed to copy controller files")
             return False
-        print("   ✅ Fallback simple_switch_13.py copied successfully")
-
+        print("   ✅ Controller files copied successfully")
     return True
 
+async def _setup_environment_async():
+    """Run the Mininet-side and Ryu-side setup concurrently"""
+    results = await asyncio.gather(asyncio.to_thread(_setup_mininet_environment),
+                                   asyncio.to_thread(_setup_ryu_environment))
+    return all(results)
+
+def setup_environment():
+    """Setup and clean environment before testing"""
+    print("🧹 Preparing Environment for 4-Internetwork Topology")
+    print("==================================================")
+    return asyncio.run(_setup_environment_async())
+
 def create_4_network_topology():
     """
     Create custom 4-network topology using mn command:
@@ -250,68 +349,94 @@ class FourNetworkTopo(Topo):
 topos = {'fournet': (lambda: FourNetworkTopo())}
 '''
 
-    # Write topology file to container
-    cmd = f'podman exec ukm_mininet bash -c "cat > /tmp/fournet_topo.py << \'EOF\'\n{topo_script}\nEOF"'
-    success, stdout, stderr = run_command(cmd)
-    if not success:
-        print("❌ Failed to create topology file")
-        return False
-    print("   ✅ Topology file created")
+    # Write topology file to the container over stdin - no heredoc, no
+    # shell parsing, and no argv size limit. Skip the write entirely
+    # when the in-container file already has the same content.
+    topo_bytes = topo_script.encode()
+    topo_sha = hashlib.sha256(topo_bytes).hexdigest()
+    success, stdout, _ = run_command(
+        ["podman", "exec", "ukm_mininet", "sha256sum", "/tmp/fournet_topo.py"],
+        capture=True)
+    if success and stdout.split()[0] == topo_sha:
+        print("   ✅ Topology file already up to date")
+    else:
+        proc = subprocess.Popen(
+            ["podman", "exec", "-i", "ukm_mininet", "tee", "/tmp/fournet_topo.py"],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        proc.communicate(topo_bytes)
+        if proc.returncode != 0:
+            print("❌ Failed to create topology file")
+            return False
+        print("   ✅ Topology file created")
 
     # Stop existing Ryu controller and start L3 router
     print("4. Starting L3 Router controller...")
-    cmd = 'podman exec ukm_ryu pkill -f ryu-manager'
-    run_command(cmd)  # Kill existing controller
-    time.sleep(2)
+    run_command(["podman", "exec", "ukm_ryu", "pkill", "-f", "ryu-manager"])  # Kill existing controller
+    # Wait only as long as it takes for the old controller to actually exit
+    wait_until(lambda: not run_command(
+        ["podman", "exec", "ukm_ryu", "pgrep", "-f", "ryu-manager"])[0], timeout=5.0)
 
     # Try to start the sophisticated L3 router app with REST API
     target_l3_file = "/opt/ukmsdn/examples/ryu/ryu_l3_router_app.py"
-    cmd = f'podman exec -d ukm_ryu bash -c "cd /opt/ukmsdn && ryu-manager {target_l3_file} --verbose"'
+    cmd = ["podman", "exec", "-d", "ukm_ryu", "bash", "-c",
+           f"cd /opt/ukmsdn && ryu-manager {target_l3_file} --verbose"]
     success, stdout, stderr = run_command(cmd)
     if success:
         print("   ✅ L3 Router controller started with REST API")
-        time.sleep(4)  # Give controller time to start
 
-        # Verify it's actually running
-        verify_cmd = f'podman exec ukm_ryu pgrep -f "ryu_l3_router_app.py"'
-        verify_success, _, _ = run_command(verify_cmd)
-        if not verify_success:
+        # One podman exec covers the process check, the curl availability
+        # check and the REST API probe; the exit code says which stage
+        # failed (2 = process not up, 3 = API not responding, 4 = no curl)
+        probe_cmd = ("pgrep -f ryu_l3_router_app.py >/dev/null || exit 2; "
+                     "command -v curl >/dev/null || exit 4; "
+                     "curl -sf http://localhost:8080/hello || exit 3")
+        probe = {"returncode": 2, "stdout": ""}
+
+        def _check_l3():
+            result = subprocess.run(["podman", "exec", "ukm_ryu", "bash", "-c", probe_cmd],
+                                    capture_output=True, text=True)
+            probe["returncode"] = result.returncode
+            probe["stdout"] = result.stdout
+            # Keep polling while the process is still starting (2) or is
+            # up but the WSGI server has not bound its port yet (3) -
+            # on a normal startup the process appears well before the
+            # REST API answers
+            return result.returncode not in (2, 3)
+
+        # Poll for the controller and its REST API instead of sleeping
+        # a fixed 4s; only a process that never appears triggers the
+        # fallback, an unanswered API is just reported below
+        wait_until(_check_l3)
+        if probe["returncode"] == 2:
             print("   ⚠️  L3 controller process not found, falling back to simple_switch_13.py")
             target_simple_file = "/opt/ukmsdn/examples/ryu/simple_switch_13.py"
-            fallback_cmd = f'podman exec -d ukm_ryu bash -c "cd /opt/ukmsdn && ryu-manager {target_simple_file} --verbose"'
+            fallback_cmd = ["podman", "exec", "-d", "ukm_ryu", "bash", "-c",
+                            f"cd /opt/ukmsdn && ryu-manager {target_simple_file} --verbose"]
             fallback_success, _, fallback_stderr = run_command(fallback_cmd)
             if not fallback_success:
                 print(f"   ❌ Fallback controller failed: {fallback_stderr}")
                 return False
             print("   ✅ Fallback to simple_switch_13.py successful")
         else:
-            # Check if REST API is responding
+            # The probe above already ran the REST API check
             print("   🔍 Checking REST API availability...")
 
-            # First check if curl is available
-            curl_check_cmd = 'podman exec ukm_ryu which curl'
-            curl_available, _, _ = run_command(curl_check_cmd)
-
-            if curl_available:
-                api_check_cmd = f'podman exec ukm_ryu curl -s -f http://localhost:8080/hello'
-                api_success, api_stdout, api_stderr = run_command(api_check_cmd, timeout=10)
-
-                if api_success and "Hello from Ryu L3 Router Controller" in api_stdout:
-                    print("   ✅ REST API is responding correctly")
-                    print("   🌐 REST API available at: http://<controller-ip>:8080/")
-                    print("     Endpoints: /hello, /flows, /activity, /subnets, /routing_table, /stats")
-                else:
-                    print("   ⚠️  REST API not responding, controller may still work for basic routing")
-                    print(f"   API check result: {api_stderr if api_stderr else 'No response'}")
-            else:
+            if probe["returncode"] == 0 and "Hello from Ryu L3 Router Controller" in probe["stdout"]:
+                print("   ✅ REST API is responding correctly")
+                print("   🌐 REST API available at: http://<controller-ip>:8080/")
+                print("     Endpoints: /hello, /flows, /activity, /subnets, /routing_table, /stats")
+            elif probe["returncode"] == 4:
                 print("   ⚠️  curl not available in container, cannot check REST API")
                 print("   🌐 REST API should be available at: http://<controller-ip>:8080/")
                 print("     Endpoints: /hello, /flows, /activity, /subnets, /routing_table, /stats")
                 # Don't fallback just for missing curl - L3 routing should still work
+            else:
+                print("   ⚠️  REST API not responding, controller may still work for basic routing")
     else:
         print("   ❌ Failed to start L3 controller, trying fallback...")
         target_simple_file = "/opt/ukmsdn/examples/ryu/simple_switch_13.py"
-        fallback_cmd = f'podman exec -d ukm_ryu bash -c "cd /opt/ukmsdn && ryu-manager {target_simple_file} --verbose"'
+        fallback_cmd = ["podman", "exec", "-d", "ukm_ryu", "bash", "-c",
+                        f"cd /opt/ukmsdn && ryu-manager {target_simple_file} --verbose"]
         fallback_success, _, fallback_stderr = run_command(fallback_cmd)
         if not fallback_success:
             print(f"   ❌ Fallback controller failed: {fallback_stderr}")
@@ -320,9 +445,21 @@ topos = {'fournet': (lambda: FourNetworkTopo())}
 
     # Run Mininet with custom topology and L3 routing
     print("\n🚀 Starting Mininet with 4-Internetwork topology...")
-    cmd = f'podman exec -it ukm_mininet mn --custom /tmp/fournet_topo.py --topo fournet --controller=remote,ip={controller_ip},port=6633 --switch ovs,datapath=user'
-
-    print(f"Running: {cmd}")
+    # Userspace datapath is the container-safe default: the openvswitch
+    # kernel module is not loadable inside these Podman containers. On a
+    # host where it is available, pass --kernel for the in-kernel
+    # fastpath (5-10x faster per packet, no kernel<->user copy).
+    if "--kernel" in sys.argv:
+        switch_arg = "ovsk,protocols=OpenFlow13"
+    else:
+        switch_arg = "ovs,datapath=user"
+    exec_flags = "-it" if sys.stdin.isatty() else "-i"
+    mn_argv = ["podman", "exec", exec_flags, "ukm_mininet", "mn",
+               "--custom", "/tmp/fournet_topo.py", "--topo", "fournet",
+               f"--controller=remote,ip={controller_ip},port=6633",
+               "--switch", switch_arg]
+
+    print(f"Running: {' '.join(mn_argv)}")
     print("\n💡 In Mininet CLI, try:")
     print("   mininet> pingall           # Should work with advanced L3 routing!")
     print("   mininet> h1 ping h6        # Cross-subnet: 10.0.0.1 -> 192.168.0.6")
@@ -336,11 +473,11 @@ topos = {'fournet': (lambda: FourNetworkTopo())}
     print("   • Subnet info: curl http://<controller-ip>:8080/subnets")
     print("   • Statistics: curl http://<controller-ip>:8080/stats")
 
-    # Execute directly with os.system for interactive mode
-    import os
+    # Replace this process with the interactive Mininet session - no
+    # extra shell or lingering Python parent, and no quoting hazards
     print("\n🎯 Launching interactive Mininet session...")
-    result = os.system(cmd)
-    return result == 0
+    sys.stdout.flush()
+    os.execvp(mn_argv[0], mn_argv)
 
 def main():
     """Main function"""
@@ -352,10 +489,10 @@ def main():
         print("❌ Environment setup failed. Exiting.")
         return
 
-    # Create and run topology
+    # Create and run topology (replaces this process on success)
     create_4_network_topology()
 
-    print("\n🎉 4-Network topology session completed!")
+    print("\n❌ Failed to launch the 4-Network topology session")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,7 +4,9 @@ Quick Ryu-Manager Check Script
 Focuses on checking if ryu-manager is working properly in ukm_ryu container
 """
 
+import json
 import subprocess
+import threading
 import time
 
 def run_command(cmd, timeout=15):
@@ -16,12 +18,94 @@ def run_command(cmd, timeout=15):
     except subprocess.TimeoutExpired:
         return False, "", "Command timed out"
 
+class PodmanShell:
+    """Persistent bash session inside a container.
+
+    Every one-shot podman exec forks podman and does a full container
+    attach; for a script made of many small probes that fixed cost
+    dominates the runtime. Keeping one long-lived 'podman exec -i
+    <container> bash' open amortizes it across all commands, with a
+    sentinel echo carrying each command's exit status back.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self.proc = subprocess.Popen(
+            ['podman', 'exec', '-i', container, 'bash'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, bufsize=1)
+
+    def run(self, command, timeout=30):
+        """Run a command in the session; returns (success, output).
+
+        A watchdog kills the session if the command does not finish
+        within timeout seconds, so a hung in-container command cannot
+        hang the host script; container_shell recreates the session on
+        the next call.
+        """
+        try:
+            self.proc.stdin.write(f'{command}\necho "__END__:$?"\n')
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            return False, ''
+        watchdog = threading.Timer(timeout, self.proc.kill)
+        watchdog.start()
+        lines = []
+        try:
+            while True:
+                line = self.proc.stdout.readline()
+                if not line:  # session died (or watchdog fired)
+                    return False, '\n'.join(lines)
+                if line.startswith('__END__:'):
+                    return int(line.split(':', 1)[1]) == 0, '\n'.join(lines)
+                lines.append(line.rstrip('\n'))
+        finally:
+            watchdog.cancel()
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+
+_shells = {}
+
+def container_shell(container):
+    """Get the shared shell for a container, (re)creating it if needed."""
+    shell = _shells.get(container)
+    if shell is None or shell.proc.poll() is not None:
+        shell = PodmanShell(container)
+        _shells[container] = shell
+    return shell
+
+def close_shells():
+    """Close all shared exec sessions."""
+    while _shells:
+        _shells.popitem()[1].close()
+
+# Controller IPs by container name - stable for the life of a
+# container, so one podman inspect per run is enough
+_IP_CACHE = {}
+
 def get_controller_ip():
     """Get the dynamic IP address of the Ryu controller container"""
-    cmd = "podman inspect ukm_ryu --format '{{range .NetworkSettings.Networks}}{{.IPAddress}}{{end}}'"
+    ip = _IP_CACHE.get('ukm_ryu')
+    if ip:
+        return ip
+    # JSON output instead of a range template that concatenates the
+    # IPs of multiple networks without a separator
+    cmd = "podman inspect ukm_ryu --format '{{json .NetworkSettings.Networks}}'"
     success, stdout, stderr = run_command(cmd)
     if success and stdout.strip():
-        return stdout.strip()
+        try:
+            nets = json.loads(stdout)
+        except ValueError:
+            return None
+        for net in (nets or {}).values():
+            if net.get('IPAddress'):
+                _IP_CACHE['ukm_ryu'] = net['IPAddress']
+                return net['IPAddress']
     return None
 
 def check_ryu_status():
@@ -29,18 +113,19 @@ def check_ryu_status():
     print("🔍 Quick Ryu-Manager Status Check")
     print("=================================")
 
+    # All in-container probes go through one shared exec session
+    ryu_shell = container_shell('ukm_ryu')
+
     # 1. Check if ryu-manager process is running
     print("1. Checking ryu-manager process...")
-    cmd = "podman exec ukm_ryu pgrep -f ryu-manager"
-    success, stdout, stderr = run_command(cmd)
+    success, stdout = ryu_shell.run("pgrep -f ryu-manager")
 
     if success and stdout.strip():
         pid = stdout.strip()
         print(f"   ✅ ryu-manager running (PID: {pid})")
 
         # Get more details about the process
-        cmd = f"podman exec ukm_ryu ps -p {pid} -o pid,ppid,cmd --no-headers"
-        success, stdout, stderr = run_command(cmd)
+        success, stdout = ryu_shell.run(f"ps -p {pid} -o pid,ppid,cmd --no-headers")
         if success:
             print(f"   📝 Process: {stdout.strip()}")
     else:
@@ -53,8 +138,7 @@ def check_ryu_status():
     if controller_ip:
         print(f"   📍 Controller IP: {controller_ip}")
 
-        cmd = "podman exec ukm_ryu netstat -tlnp | grep 6633"
-        success, stdout, stderr = run_command(cmd)
+        success, stdout = ryu_shell.run("netstat -tlnp | grep 6633")
 
         if success and "6633" in stdout:
             print("   ✅ Port 6633 listening")
@@ -67,10 +151,10 @@ def check_ryu_status():
 
     # 3. Quick connectivity test
     print("\n3. Testing basic connectivity...")
-    test_cmd = f'podman exec ukm_mininet timeout 10 mn --controller=remote,ip={controller_ip},port=6633 --topo=single,1 --switch ovs,datapath=user --test pingall'
-    success, stdout, stderr = run_command(test_cmd, timeout=15)
+    test_cmd = (f'timeout 10 mn --controller=remote,ip={controller_ip},port=6633 '
+                '--topo=single,1 --switch ovs,datapath=user --test pingall 2>&1')
+    success, output = container_shell('ukm_mininet').run(test_cmd)
 
-    output = stdout + stderr
     if "0% dropped" in output or "received" in output:
         print("   ✅ Basic connectivity works")
         return True
@@ -86,8 +170,7 @@ def restart_ryu_controller():
 
     # Kill existing ryu-manager
     print("1. Stopping existing ryu-manager...")
-    cmd = "podman exec ukm_ryu pkill -f ryu-manager"
-    run_command(cmd)
+    container_shell('ukm_ryu').run("pkill -f ryu-manager")
     time.sleep(2)
 
     # Start simple_switch_13
@@ -140,4 +223,7 @@ def main():
             return False
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        close_shells()
\ No newline at end of file
@@ -0,0 +1,737 @@
+#!/usr/bin/env python3
+"""
+Ryu DDoS Detection Controller
+Tracks per-source-IP traffic rates, evaluates configurable threshold
+rules and installs drop flows for attacking sources. REST API exposes
+live rates, blocked sources and rule configuration for dataset
+generation experiments.
+"""
+
+from ryu.base import app_manager
+from ryu.controller import ofp_event
+from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER
+from ryu.controller.handler import set_ev_cls
+from ryu.ofproto import ofproto_v1_3
+from ryu.lib.packet import ether_types
+from ryu.app.wsgi import WSGIApplication, route, ControllerBase
+
+import itertools
+import json
+import socket
+import struct
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from webob import Response
+
+import numpy as np
+
+# orjson emits UTF-8 bytes directly and skips the stdlib encoder's
+# slow pretty-printing path; fall back to json when it is missing
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+# Import standardized logging (with fallback for Ryu environment)
+try:
+    from ..utils.logger import get_controller_logger
+except ImportError:
+    try:
+        from utils.logger import get_controller_logger
+    except ImportError:
+        def get_controller_logger(log_dir=None):
+            import logging
+            return logging.getLogger('ryu.app.DDoSDetectionController')
+
+def _mac_str(mac_bytes):
+    """aa:bb:cc:dd:ee:ff form of a raw 6-byte MAC."""
+    return ':'.join('%02x' % b for b in mac_bytes)
+
+def _ip_to_int(ip):
+    """32-bit integer key for a dotted-quad IPv4 string."""
+    return struct.unpack('!I', socket.inet_aton(ip))[0]
+
+def _ip_to_str(n):
+    """Dotted-quad form of a 32-bit IPv4 key."""
+    return socket.inet_ntoa(n.to_bytes(4, 'big'))
+
+def _evaluate_all(pps, bps, pps_thr, bps_thr, logic_is_and, enabled):
+    """First matching enabled rule index per source, -1 for none.
+
+    Evaluates every rule against every tracked source as array
+    comparisons over an (n_rules, n_ips) grid, so the detector makes
+    one call per cycle instead of a Python loop per IP per rule.
+    Absent thresholds are encoded as NaN (compares False).
+    """
+    n_ips = pps.shape[0]
+    if not n_ips or not pps_thr.shape[0]:
+        return np.full(n_ips, -1, dtype=np.int64)
+    has_pps = ~np.isnan(pps_thr)[:, None]
+    has_bps = ~np.isnan(bps_thr)[:, None]
+    pps_hit = pps[None, :] >= pps_thr[:, None]
+    bps_hit = bps[None, :] >= bps_thr[:, None]
+    and_hit = (pps_hit | ~has_pps) & (bps_hit | ~has_bps) & (has_pps | has_bps)
+    or_hit = (pps_hit & has_pps) | (bps_hit & has_bps)
+    hit = np.where(logic_is_and[:, None], and_hit, or_hit) & enabled[:, None]
+    return np.where(hit.any(axis=0), hit.argmax(axis=0), -1)
+
+class IpTable:
+    """Struct-of-arrays rate table for tracked source IPs.
+
+    Instead of one dict of ring buckets per IP, all sources share 2D
+    NumPy arrays (one row per IP, one column per window second) plus
+    parallel per-row vectors, indexed through a single {ip: row} dict.
+    Refreshing every rate becomes one sum(axis=1) over contiguous
+    memory rather than a Python loop over per-IP objects.
+    """
+
+    def __init__(self, window, capacity=256):
+        self.window = window
+        self.capacity = capacity
+        self.pkt = np.zeros((capacity, window), dtype=np.int64)
+        self.byt = np.zeros((capacity, window), dtype=np.int64)
+        self.last_bucket_sec = np.zeros(capacity, dtype=np.int64)
+        self.last_seen = np.zeros(capacity, dtype=np.float64)
+        self.pps = np.zeros(capacity, dtype=np.float64)
+        self.bps = np.zeros(capacity, dtype=np.float64)
+        self.index = {}
+        # High-water mark of ever-allocated rows plus a free list of
+        # recycled ones: spoofed one-shot sources hand their row back
+        # instead of growing the table forever
+        self.n_rows = 0
+        self.free_rows = []
+        # Rows touched since the last rate refresh; the updater only
+        # recomputes these instead of every tracked source
+        self.dirty = set()
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in ('pkt', 'byt'):
+            old = getattr(self, name)
+            new = np.zeros((self.capacity, self.window), dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+        for name in ('last_bucket_sec', 'last_seen', 'pps', 'bps'):
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def get_or_add(self, ip, now_sec):
+        """Row index for ip, reusing a recycled row when one is free."""
+        row = self.index.get(ip)
+        if row is None:
+            if self.free_rows:
+                row = self.free_rows.pop()
+            else:
+                row = self.n_rows
+                if row == self.capacity:
+                    self._grow()
+                self.n_rows += 1
+            self.index[ip] = row
+            self.last_bucket_sec[row] = now_sec
+            self.last_seen[row] = float(now_sec)
+        return row
+
+    def record(self, row, now_sec, nbytes, now):
+        """Count one packet of nbytes against a row's current slot."""
+        last_sec = self.last_bucket_sec[row]
+        if now_sec != last_sec:
+            # Zero the slots between the old second and the new one so
+            # stale counts never leak into the window; bounded by the
+            # window size no matter how long the gap was
+            gap = min(now_sec - last_sec, self.window)
+            for step in range(1, gap + 1):
+                slot = (last_sec + step) % self.window
+                self.pkt[row, slot] = 0
+                self.byt[row, slot] = 0
+            self.last_bucket_sec[row] = now_sec
+        idx = now_sec % self.window
+        self.pkt[row, idx] += 1
+        self.byt[row, idx] += nbytes
+        self.last_seen[row] = now
+        self.dirty.add(row)
+
+    def refresh_rates(self, now):
+        """Recompute pps/bps for rows that saw traffic since last tick.
+
+        The 2D bucket sums - the expensive part - run only over the
+        dirty rows (swapped out atomically so packets landing mid-pass
+        go to a fresh set); the remaining 1D idle sweep is cheap and
+        zeroes sources that went quiet.
+        """
+        n = self.n_rows
+        if not n:
+            return
+        dirty = self.dirty
+        self.dirty = set()
+        if dirty:
+            rows = np.fromiter(dirty, dtype=np.int64, count=len(dirty))
+            self.pps[rows] = self.pkt[rows].sum(axis=1) / self.window
+            self.bps[rows] = self.byt[rows].sum(axis=1) / self.window
+        # Sources idle for longer than the window read as silent even
+        # though their stale buckets are only zeroed on the next packet
+        idle = now - self.last_seen[:n] > self.window
+        self.pps[:n][idle] = 0.0
+        self.bps[:n][idle] = 0.0
+
+    def recycle_idle(self, now, max_idle):
+        """Hand rows of long-idle sources back to the free list."""
+        n = self.n_rows
+        if not n:
+            return
+        # Vectorized staleness test first; the dict is only walked
+        # when something is actually reclaimable
+        stale = now - self.last_seen[:n] > max_idle
+        if not stale.any():
+            return
+        for ip, row in list(self.index.items()):
+            if stale[row]:
+                del self.index[ip]
+                self.pkt[row].fill(0)
+                self.byt[row].fill(0)
+                self.pps[row] = 0.0
+                self.bps[row] = 0.0
+                # inf keeps freed rows out of every idle/stale mask
+                self.last_seen[row] = np.inf
+                self.free_rows.append(row)
+
+class DDoSDetectionController(app_manager.RyuApp):
+    OFP_VERSIONS = [ofproto_v1_3.OFP_VERSION]
+    _CONTEXTS = {'wsgi': WSGIApplication}
+
+    # Sliding window (seconds) for per-IP rate accounting. Rates are
+    # kept in a fixed ring of one pps/bps bucket per second: each
+    # packet updates a single slot indexed by int(time) % window, and
+    # a rate query is a sum over the tiny fixed array. No per-packet
+    # history objects are allocated, so memory stays bounded no matter
+    # how hard an attacker floods.
+    RATE_WINDOW = 10
+    CHECK_INTERVAL = 2      # seconds between threat evaluations
+    BLOCK_TIMEOUT = 60      # hard_timeout of installed drop flows
+    IDLE_EVICT = 5 * RATE_WINDOW  # recycle a source's row after this idle time
+
+    DEFAULT_RULES = [
+        {'name': 'pps_flood', 'enabled': True, 'logic': 'OR',
+         'thresholds': {'pps': 1000, 'bps': None}, 'action': 'block'},
+        {'name': 'volumetric', 'enabled': True, 'logic': 'AND',
+         'thresholds': {'pps': 500, 'bps': 1000000}, 'action': 'block'},
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super(DDoSDetectionController, self).__init__(*args, **kwargs)
+        self.mac_to_port = {}
+        self.switches = {}
+        # maxlen evicts the oldest entry in O(1); a list's pop(0)
+        # shifts every remaining element on each overflow
+        self.max_log_entries = 200
+        self.activity_log = deque(maxlen=self.max_log_entries)
+        self.start_time = time.time()
+        # itertools.count.__next__ runs in C, so incrementing is
+        # GIL-atomic with no read-modify-write race between the event
+        # loop and anything else that might count packets
+        self._pkt_counter = itertools.count()
+        self.total_byte_count = 0
+
+        # Per-source-IP rate state lives in a shared struct-of-arrays
+        # table; rows are allocated on first sight of a source
+        self.traffic_stats = IpTable(self.RATE_WINDOW)
+
+        self.detection_rules = [dict(r) for r in self.DEFAULT_RULES]
+        self._compile_rules()
+        self.whitelist = set()
+        self.blocked_ips = {}
+        # Union of blocked and whitelisted sources so the per-packet
+        # path pays one membership probe; which side a hit came from
+        # is only resolved on the (rare) hit
+        self._skip_set = set()
+        # Lazily built pre-serialized drop OFPFlowMod (None = not yet
+        # built, False = template unavailable, fall back to the parser)
+        self._drop_tmpl = None
+
+        # Serialized /stats and /blocked bodies, rebuilt once a second
+        # by the updater thread; REST handlers return these bytes
+        # directly instead of walking live tables the event thread is
+        # mutating
+        self._stats_cache = _dumps({})
+        self._blocked_cache = _dumps([])
+        # Snapshot building/serialization runs on this single worker
+        # so a large encode never delays the next rate tick; one
+        # worker keeps publications in order
+        self._snapshot_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='ddos-snapshot')
+        self._snapshot_future = None
+
+        # Thread wakeup plumbing: stop is observed by both loops, and
+        # a config update wakes the detector immediately instead of it
+        # sleeping out the rest of its interval on stale thresholds
+        self._stop_event = threading.Event()
+        self._config_event = threading.Event()
+
+        if 'wsgi' in kwargs:
+            wsgi = kwargs['wsgi']
+            wsgi.register(DDoSDetectionAPI, self)
+        else:
+            self.logger.warning("WSGI context not provided. REST API will not be available.")
+
+        # Initialize standardized logging
+        try:
+            self.std_logger = get_controller_logger()
+        except:
+            self.std_logger = self.logger
+
+        self.stats_thread = threading.Thread(target=self._stats_updater_thread)
+        self.stats_thread.daemon = True
+        self.stats_thread.start()
+        self.detector_thread = threading.Thread(target=self._threat_detector_thread)
+        self.detector_thread.daemon = True
+        self.detector_thread.start()
+        self.log_activity('info', 'DDoS Detection Controller started')
+        self.std_logger.info('DDoS Detection Controller started')
+
+    @property
+    def total_packet_count(self):
+        """Snapshot of the packet counter without consuming it.
+
+        count.__reduce__ exposes the value the iterator would yield
+        next, which is exactly how many packets have been counted.
+        """
+        return self._pkt_counter.__reduce__()[1][0]
+
+    def log_activity(self, level, message):
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        entry = {'timestamp': timestamp, 'level': level, 'message': message}
+        self.activity_log.append(entry)
+        self.logger.info(f"[{level.upper()}] {message}")
+
+    @set_ev_cls(ofp_event.EventOFPSwitchFeatures, CONFIG_DISPATCHER)
+    def switch_features_handler(self, ev):
+        datapath = ev.msg.datapath
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        dpid = datapath.id
+
+        self.switches[dpid] = {
+            'datapath': datapath,
+            'connected_time': time.time()
+        }
+
+        # Install table-miss flow entry
+        match = parser.OFPMatch()
+        actions = [parser.OFPActionOutput(ofproto.OFPP_CONTROLLER, ofproto.OFPCML_NO_BUFFER)]
+        self.add_flow(datapath, 0, match, actions)
+        self.log_activity('info', f'Switch {hex(dpid)} connected')
+
+    @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
+    def packet_in_handler(self, ev):
+        msg = ev.msg
+        datapath = msg.datapath
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        in_port = msg.match['in_port']
+        dpid = datapath.id
+
+        data = msg.data
+        if len(data) < 14:
+            return
+
+        # Hand-parse the headers instead of paying for a full
+        # packet.Packet() protocol walk per PacketIn: the handler only
+        # needs the MACs, the ethertype and (for IPv4) the source IP
+        ethertype = struct.unpack_from('!H', data, 12)[0]
+        if ethertype == ether_types.ETH_TYPE_LLDP:
+            return
+
+        # Raw 6-byte MACs work directly as dict keys; they are only
+        # rendered as text when a flow actually gets installed
+        dst = data[0:6]
+        src = data[6:12]
+
+        src_ip = None
+        skip_stats = False
+        if ethertype == ether_types.ETH_TYPE_IP and len(data) >= 34:
+            # Source IP as a plain 32-bit int straight off the wire:
+            # cheaper to hash and compare than any string form, and no
+            # per-packet string allocation at all. Dotted quads only
+            # exist at the REST/OpenFlow boundary.
+            src_ip = int.from_bytes(data[26:30], 'big')
+            if src_ip in self._skip_set:
+                # Packets from an already-blocked source keep trickling
+                # in until its drop flow lands on the switches; bail
+                # out before any stats or L2 work. Whitelisted sources
+                # are still forwarded, just not rate-tracked.
+                if src_ip in self.blocked_ips:
+                    return
+                skip_stats = True
+
+        next(self._pkt_counter)
+        self.total_byte_count += len(data)
+
+        # Hot references rebound to locals once per packet: LOAD_FAST
+        # beats repeated LOAD_ATTR/dict walks on the PacketIn path
+        port_table = self.mac_to_port.setdefault(dpid, {})
+        traffic_stats = self.traffic_stats
+
+        port_table[src] = in_port
+
+        if src_ip is not None and not skip_stats:
+            # One clock read per packet, shared by the bucket index
+            # and the last_seen stamp
+            now = time.time()
+            now_sec = int(now)
+            row = traffic_stats.get_or_add(src_ip, now_sec)
+            traffic_stats.record(row, now_sec, len(data), now)
+
+        # L2 learning switch forwarding
+        out_port = port_table.get(dst, ofproto.OFPP_FLOOD)
+        actions = [parser.OFPActionOutput(out_port)]
+
+        if out_port != ofproto.OFPP_FLOOD:
+            match = parser.OFPMatch(in_port=in_port,
+                                    eth_dst=_mac_str(dst),
+                                    eth_src=_mac_str(src))
+            if msg.buffer_id != ofproto.OFP_NO_BUFFER:
+                self.add_flow(datapath, 1, match, actions, msg.buffer_id)
+            else:
+                self.add_flow(datapath, 1, match, actions)
+
+        out_data = data if msg.buffer_id == ofproto.OFP_NO_BUFFER else None
+        out = parser.OFPPacketOut(datapath=datapath, buffer_id=msg.buffer_id,
+                                  in_port=in_port, actions=actions, data=out_data)
+        datapath.send_msg(out)
+
+    def add_flow(self, datapath, priority, match, actions, buffer_id=None,
+                 idle_timeout=30, hard_timeout=300):
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS, actions)]
+        mod_kwargs = {
+            'datapath': datapath,
+            'priority': priority,
+            'match': match,
+            'instructions': inst,
+            'idle_timeout': idle_timeout,
+            'hard_timeout': hard_timeout
+        }
+        if buffer_id:
+            mod_kwargs['buffer_id'] = buffer_id
+        mod = parser.OFPFlowMod(**mod_kwargs)
+        datapath.send_msg(mod)
+
+    def _stats_updater_thread(self):
+        """Refresh all per-IP rates once a second in one vector pass,
+        then rebuild the serialized REST snapshots.
+
+        Ticks are scheduled against time.monotonic() so the 1 Hz beat
+        neither drifts by the loop's own work time nor jumps with NTP
+        corrections the way time.sleep(1) after wall-clock reads does.
+        """
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                now = time.time()
+                self.traffic_stats.refresh_rates(now)
+                self.traffic_stats.recycle_idle(now, self.IDLE_EVICT)
+                # Skip a publication rather than queueing behind a
+                # still-running encode of a huge table
+                if self._snapshot_future is None or self._snapshot_future.done():
+                    self._snapshot_future = self._snapshot_executor.submit(
+                        self._publish_snapshots, now)
+            except Exception as e:
+                self.logger.error(f"Error updating stats: {e}")
+            next_tick += 1.0
+            self._stop_event.wait(max(0.0, next_tick - time.monotonic()))
+
+    def _publish_snapshots(self, now):
+        """Build and serialize the cached REST bodies off the tick loop."""
+        try:
+            self._stats_cache = _dumps({
+                'uptime': now - self.start_time,
+                'total_packet_count': self.total_packet_count,
+                'total_byte_count': self.total_byte_count,
+                'switches': len(self.switches),
+                'sources': self.get_stats_summary(),
+            })
+            self._blocked_cache = _dumps(self.get_blocked_summary())
+        except Exception as e:
+            self.logger.error(f"Error publishing snapshots: {e}")
+
+    def _threat_detector_thread(self):
+        """Evaluate detection rules against the tracked rates.
+
+        Scheduled on the monotonic clock like the stats updater; a
+        config update sets _config_event so new thresholds apply on
+        the next pass instead of after a stale sleep.
+        """
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                now = time.time()
+                # Expire blocks whose drop flows have timed out
+                for ip in [ip for ip, info in self.blocked_ips.items()
+                           if now - info['blocked_at'] > self.BLOCK_TIMEOUT]:
+                    self._unblock_ip(ip)
+
+                table = self.traffic_stats
+                n = table.n_rows
+                if n:
+                    # One snapshot read per cycle: names and arrays
+                    # stay consistent across a concurrent config update
+                    rule_names, pps_thr, bps_thr, logic_is_and, enabled = \
+                        self._rules_snapshot
+                    fired = _evaluate_all(table.pps[:n], table.bps[:n],
+                                          pps_thr, bps_thr,
+                                          logic_is_and, enabled)
+                    hits = np.nonzero(fired >= 0)[0]
+                    if hits.size:
+                        # Only fired sources re-enter the Python path
+                        row_to_ip = {row: ip for ip, row in table.index.items()}
+                        for row in hits:
+                            # Freed rows can appear in the scan range
+                            # but are zeroed, so they never fire; the
+                            # .get guards the race with recycling
+                            ip = row_to_ip.get(int(row))
+                            if ip is None:
+                                continue
+                            if ip in self.blocked_ips or ip in self.whitelist:
+                                continue
+                            self._block_ip(ip, rule_names[int(fired[row])],
+                                           float(table.pps[row]),
+                                           float(table.bps[row]))
+            except Exception as e:
+                self.logger.error(f"Error in threat detector: {e}")
+            next_tick += self.CHECK_INTERVAL
+            if self._config_event.wait(max(0.0, next_tick - time.monotonic())):
+                self._config_event.clear()
+                next_tick = time.monotonic()
+
+    def _compile_rules(self):
+        """Publish detection_rules as one immutable compiled snapshot.
+
+        The snapshot bundles the rule names and their lowered threshold
+        arrays into a single tuple replaced by one attribute store -
+        GIL-atomic, so the detector thread always sees arrays and rule
+        metadata from the same configuration, with no lock on either
+        side. Names are pre-extracted so the fired path indexes a tuple
+        instead of digging through rule dicts.
+        """
+        rules = self.detection_rules
+        nan = float('nan')
+        thr = [r.get('thresholds', {}) for r in rules]
+        self._rules_snapshot = (
+            tuple(r.get('name', 'rule%d' % i) for i, r in enumerate(rules)),
+            np.array([t.get('pps') if t.get('pps') is not None else nan
+                      for t in thr], dtype=np.float64),
+            np.array([t.get('bps') if t.get('bps') is not None else nan
+                      for t in thr], dtype=np.float64),
+            np.array([r.get('logic', 'OR') == 'AND' for r in rules], dtype=bool),
+            np.array([r.get('enabled', True) for r in rules], dtype=bool),
+        )
+
+    def _build_drop_template(self, datapath):
+        """Serialize one drop OFPFlowMod with marker field values and
+        note where they landed in the wire image.
+
+        The message layout is identical for every switch (OFP 1.3 is
+        pinned), so later blocks can copy these bytes and splice in the
+        real source IP and hard_timeout instead of rebuilding and
+        re-serializing the whole Python object graph. Returns
+        (bytes, ip_offset, timeout_offset), or None when the markers
+        cannot be located (then the parser path is used).
+        """
+        try:
+            parser = datapath.ofproto_parser
+            ofproto = datapath.ofproto
+            ip_marker = '222.173.190.239'
+            ht_marker = 0xFEED
+            match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                    ipv4_src=ip_marker)
+            inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS, [])]
+            mod = parser.OFPFlowMod(datapath=datapath, priority=100,
+                                    match=match, instructions=inst,
+                                    hard_timeout=ht_marker)
+            mod.serialize()
+            buf = bytes(mod.buf)
+            ip_off = buf.find(socket.inet_aton(ip_marker))
+            ht_off = buf.find(struct.pack('!H', ht_marker))
+            if ip_off < 0 or ht_off < 0:
+                return None
+            return (buf, ip_off, ht_off)
+        except Exception as e:
+            self.logger.warning(f"Drop-flow template unavailable: {e}")
+            return None
+
+    def _block_ip(self, ip, rule_name, pps, bps):
+        """Install drop flows for a source IP on every switch."""
+        switches = list(self.switches.values())
+        if switches:
+            datapath = switches[0]['datapath']
+            tmpl = self._drop_tmpl
+            if tmpl is None:
+                tmpl = self._build_drop_template(datapath) or False
+                self._drop_tmpl = tmpl
+            if tmpl:
+                # Splice the real IP and timeout into a copy of the
+                # pre-serialized message and put raw bytes on the wire
+                buf, ip_off, ht_off = tmpl
+                msg = bytearray(buf)
+                msg[ip_off:ip_off + 4] = ip.to_bytes(4, 'big')
+                struct.pack_into('!H', msg, ht_off, self.BLOCK_TIMEOUT)
+                raw = bytes(msg)
+                for switch_info in switches:
+                    switch_info['datapath'].send(raw)
+            else:
+                # Fallback: shared match/instructions, per-switch mod
+                ofproto = datapath.ofproto
+                parser = datapath.ofproto_parser
+                match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                        ipv4_src=_ip_to_str(ip))
+                inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS, [])]
+                timeout = self.BLOCK_TIMEOUT
+                for switch_info in switches:
+                    datapath = switch_info['datapath']
+                    datapath.send_msg(parser.OFPFlowMod(
+                        datapath=datapath, priority=100, match=match,
+                        instructions=inst, hard_timeout=timeout))
+
+        self._skip_set.add(ip)
+        self.blocked_ips[ip] = {
+            'rule': rule_name,
+            'blocked_at': time.time(),
+            'pps': pps,
+            'bps': bps,
+        }
+        self.log_activity('warning',
+                          f'BLOCKED {_ip_to_str(ip)}: rule={rule_name} '
+                          f'pps={pps:.0f} bps={bps:.0f}')
+
+    def _unblock_ip(self, ip):
+        """Remove drop flows for a source IP and forget the block."""
+        switches = list(self.switches.values())
+        if switches:
+            datapath = switches[0]['datapath']
+            ofproto = datapath.ofproto
+            parser = datapath.ofproto_parser
+            match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                    ipv4_src=_ip_to_str(ip))
+            for switch_info in switches:
+                datapath = switch_info['datapath']
+                datapath.send_msg(parser.OFPFlowMod(
+                    datapath=datapath, command=ofproto.OFPFC_DELETE,
+                    out_port=ofproto.OFPP_ANY, out_group=ofproto.OFPG_ANY,
+                    match=match))
+        self.blocked_ips.pop(ip, None)
+        if ip not in self.whitelist:
+            self._skip_set.discard(ip)
+        self.log_activity('info', f'UNBLOCKED {_ip_to_str(ip)}')
+
+    def update_config(self, config):
+        """Apply a configuration update from the REST API."""
+        if 'rules' in config:
+            self.detection_rules = [dict(r) for r in config['rules']]
+            self._compile_rules()
+        if 'whitelist' in config:
+            self.whitelist = {_ip_to_int(ip) for ip in config['whitelist']}
+            self._skip_set = set(self.blocked_ips) | self.whitelist
+        self._config_event.set()
+        self.log_activity('info', 'Detection configuration updated')
+
+    def add_whitelist(self, ip):
+        ip_key = _ip_to_int(ip)
+        self.whitelist.add(ip_key)
+        self._skip_set.add(ip_key)
+        if ip_key in self.blocked_ips:
+            self._unblock_ip(ip_key)
+        self.log_activity('info', f'Whitelisted {ip}')
+
+    def get_stats_summary(self):
+        """Per-source rate summary for the REST API."""
+        table = self.traffic_stats
+        return [{
+            'ip': _ip_to_str(ip),
+            'pps': float(table.pps[row]),
+            'bps': float(table.bps[row]),
+            'last_seen': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(table.last_seen[row])),
+        } for ip, row in list(table.index.items())]
+
+    def get_blocked_summary(self):
+        """Blocked-source summary for the REST API."""
+        return [{
+            'ip': _ip_to_str(ip),
+            'rule': info['rule'],
+            'blocked_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(info['blocked_at'])),
+            'pps': info['pps'],
+            'bps': info['bps'],
+        } for ip, info in list(self.blocked_ips.items())]
+
+
+class DDoSDetectionAPI(ControllerBase):
+    """REST API for DDoS Detection Controller"""
+
+    def __init__(self, req, link, data, **config):
+        super(DDoSDetectionAPI, self).__init__(req, link, data, **config)
+        self.controller_app = data
+
+    @route('hello', '/hello', methods=['GET'])
+    def hello(self, req, **kwargs):
+        """Health check endpoint"""
+        response = {"message": "Hello from Ryu DDoS Detection Controller!"}
+        body = _dumps(response)
+        return Response(content_type='application/json; charset=utf-8', body=body)
+
+    @route('stats', '/stats', methods=['GET'])
+    def get_stats(self, req, **kwargs):
+        """Get per-source traffic rates (snapshot, at most 1s old)"""
+        return Response(content_type='application/json; charset=utf-8',
+                        body=self.controller_app._stats_cache)
+
+    @route('blocked', '/blocked', methods=['GET'])
+    def get_blocked(self, req, **kwargs):
+        """Get currently blocked sources (snapshot, at most 1s old)"""
+        return Response(content_type='application/json; charset=utf-8',
+                        body=self.controller_app._blocked_cache)
+
+    @route('config', '/config', methods=['GET'])
+    def get_config(self, req, **kwargs):
+        """Get detection rule configuration"""
+        config = {
+            'rules': self.controller_app.detection_rules,
+            'whitelist': [_ip_to_str(n) for n in sorted(self.controller_app.whitelist)],
+            'check_interval': self.controller_app.CHECK_INTERVAL,
+            'rate_window': self.controller_app.RATE_WINDOW,
+        }
+        body = _dumps(config)
+        return Response(content_type='application/json; charset=utf-8', body=body)
+
+    @route('config', '/config', methods=['PUT'])
+    def set_config(self, req, **kwargs):
+        """Update detection rule configuration"""
+        try:
+            config = json.loads(req.body)
+        except ValueError:
+            return Response(status=400)
+        self.controller_app.update_config(config)
+        body = _dumps({'result': 'updated'})
+        return Response(content_type='application/json; charset=utf-8', body=body)
+
+    @route('whitelist', '/whitelist', methods=['POST'])
+    def post_whitelist(self, req, **kwargs):
+        """Add a source IP to the whitelist"""
+        try:
+            ip = json.loads(req.body)['ip']
+        except (ValueError, KeyError):
+            return Response(status=400)
+        self.controller_app.add_whitelist(ip)
+        body = _dumps({'result': 'whitelisted', 'ip': ip})
+        return Response(content_type='application/json; charset=utf-8', body=body)
+
+    @route('activity', '/activity', methods=['GET'])
+    def get_activity(self, req, **kwargs):
+        """Get recent activity log"""
+        body = _dumps(list(self.controller_app.activity_log))
+        return Response(content_type='application/json; charset=utf-8', body=body)
@@ -18,10 +18,44 @@ from ryu.app.wsgi import WSGIApplication, route, ControllerBase
 import json
 import time
 import threading
+
+import numpy as np
+
+# orjson serializes straight to bytes with no separate .encode() pass;
+# fall back to the stdlib when it is not installed
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+import functools
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 from webob import Response
 
+def _match_to_dict(match):
+    """OXM fields of an OFPMatch as a plain dict."""
+    return dict(match.items())
+
+def _instructions_to_dict(instructions):
+    """Compact structured form of flow instructions."""
+    out = []
+    for inst in instructions:
+        if hasattr(inst, 'actions'):
+            out.append({'type': inst.type,
+                        'actions': [getattr(a, 'port', a.__class__.__name__)
+                                    for a in inst.actions]})
+        else:
+            out.append({'type': inst.type})
+    return out
+
+@functools.lru_cache(maxsize=4096)
+def _mac_to_int(mac):
+    """Integer form of an aa:bb:cc:dd:ee:ff MAC string, cached since
+    the same hosts show up packet after packet."""
+    return int(mac.replace(':', ''), 16)
+
 # Import standardized logging (with fallback for Ryu environment)
 try:
     from ..utils.logger import get_controller_logger
@@ -38,17 +72,41 @@ class FlowMonitorController(app_manager.RyuApp):
     OFP_VERSIONS = [ofproto_v1_3.OFP_VERSION]
     _CONTEXTS = {'wsgi': WSGIApplication}
 
+    # Adaptive stats polling: the interval doubles while counters are
+    # quiet and halves when traffic moves, within these bounds
+    POLL_MIN = 1.0
+    POLL_MAX = 30.0
+    POLL_DELTA_THRESHOLD = 0.1  # relative packet-count change per cycle
+
     def __init__(self, *args, **kwargs):
         super(FlowMonitorController, self).__init__(*args, **kwargs)
+        # Flat (dpid, mac_int) -> port table: one hash lookup per
+        # packet instead of the nested per-dpid dict dance
         self.mac_to_port = {}
         self.switches = {}
         self.links = {}
         self.flow_stats = defaultdict(dict)
         self.port_stats = defaultdict(dict)
-        self.activity_log = []
+        # maxlen evicts the oldest entry in O(1); a list's pop(0) would
+        # shift every remaining element on each overflow
+        self.activity_log = deque(maxlen=100)
         self.start_time = time.time()
-        self.packet_count = 0
-        self.byte_count = 0
+        # Traffic accounting in fixed-size ring buffers of per-second
+        # totals (10-minute window) instead of unbounded cumulative
+        # counters: each packet updates one slot, eviction is zeroing
+        # the slot being reused, and a window query is one vector sum.
+        self.ring_window = 600
+        self.ring_pkts = np.zeros(self.ring_window, dtype=np.int64)
+        self.ring_bytes = np.zeros(self.ring_window, dtype=np.int64)
+        self.ring_idx = 0
+        self.ring_last_sec = int(time.time())
+        self.poll_interval = 2.0
+        self.prev_totals = {}
+        self.flow_deltas = {}
+        # Generation counters let the REST API reuse serialized
+        # responses until the underlying data actually changes
+        self.flow_gen = 0
+        self.topo_gen = 0
 
         if 'wsgi' in kwargs:
             wsgi = kwargs['wsgi']
@@ -74,8 +132,6 @@ class FlowMonitorController(app_manager.RyuApp):
         timestamp = datetime.now().strftime('%H:%M:%S')
         entry = {'timestamp': timestamp, 'level': level, 'message': message}
         self.activity_log.append(entry)
-        if len(self.activity_log) > 100:
-            self.activity_log.pop(0)
         self.logger.info(f"[{level.upper()}] {message}")
 
     @set_ev_cls(ofp_event.EventOFPSwitchFeatures, CONFIG_DISPATCHER)
@@ -105,23 +161,44 @@ class FlowMonitorController(app_manager.RyuApp):
         parser = datapath.ofproto_parser
         in_port = msg.match['in_port']
         dpid = datapath.id
+        data = msg.data
 
-        pkt = packet.Packet(msg.data)
-        eth = pkt.get_protocols(ethernet.ethernet)[0]
-
-        if eth.ethertype == ether_types.ETH_TYPE_LLDP:
+        # Drop LLDP by peeking at the raw ethertype bytes before paying
+        # for a full packet parse - topology discovery floods these on
+        # every link and we discard them anyway
+        if len(data) >= 14 and data[12] == 0x88 and data[13] == 0xCC:
             return
 
+        pkt = packet.Packet(data)
+        eth = pkt.get_protocols(ethernet.ethernet)[0]
+
         dst = eth.dst
         src = eth.src
 
-        self.packet_count += 1
-        self.byte_count += len(msg.data)
+        now = int(time.time())
+        if now - self.ring_last_sec >= self.ring_window:
+            # Idle longer than the whole window: reset instead of
+            # stepping through every stale second
+            self.ring_pkts.fill(0)
+            self.ring_bytes.fill(0)
+            self.ring_last_sec = now
+        elif now < self.ring_last_sec:
+            # Wall clock stepped backwards (NTP correction): clamp and
+            # keep accounting into the current slot rather than spinning
+            # until real time catches back up
+            self.ring_last_sec = now
+        else:
+            while now > self.ring_last_sec:
+                self.ring_idx = (self.ring_idx + 1) % self.ring_window
+                self.ring_pkts[self.ring_idx] = 0
+                self.ring_bytes[self.ring_idx] = 0
+                self.ring_last_sec += 1
+        self.ring_pkts[self.ring_idx] += 1
+        self.ring_bytes[self.ring_idx] += len(data)
 
-        self.mac_to_port.setdefault(dpid, {})
-        self.mac_to_port[dpid][src] = in_port
+        self.mac_to_port[(dpid, _mac_to_int(src))] = in_port
 
-        out_port = self.mac_to_port[dpid].get(dst, ofproto.OFPP_FLOOD)
+        out_port = self.mac_to_port.get((dpid, _mac_to_int(dst)), ofproto.OFPP_FLOOD)
         actions = [parser.OFPActionOutput(out_port)]
 
         if out_port != ofproto.OFPP_FLOOD:
@@ -158,27 +235,77 @@ class FlowMonitorController(app_manager.RyuApp):
 
     @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
     def flow_stats_reply_handler(self, ev):
-        flows = []
-        for stat in ev.msg.body:
-            flows.append({
-                'priority': stat.priority,
-                'match': str(stat.match),
-                'actions': str(stat.instructions),
-                'packet_count': stat.packet_count,
-                'byte_count': stat.byte_count,
-                'duration_sec': stat.duration_sec
-            })
-        self.flow_stats[ev.msg.datapath.id] = flows
+        body = ev.msg.body
+        n = len(body)
+        # Counters are stored structure-of-arrays: four contiguous
+        # numpy columns instead of one dict per flow per poll. Match
+        # and instruction fields are kept as small structured dicts
+        # rather than their repr strings. Flow dicts are only
+        # materialized when a REST response actually has to be rebuilt.
+        priority = np.empty(n, dtype='i4')
+        pkts = np.empty(n, dtype='i8')
+        byts = np.empty(n, dtype='i8')
+        dur = np.empty(n, dtype='i4')
+        matches = []
+        actions = []
+        for i, stat in enumerate(body):
+            priority[i] = stat.priority
+            pkts[i] = stat.packet_count
+            byts[i] = stat.byte_count
+            dur[i] = stat.duration_sec
+            matches.append(_match_to_dict(stat.match))
+            actions.append(_instructions_to_dict(stat.instructions))
+        dpid = ev.msg.datapath.id
+        # switch_id is rendered here, once per reply, rather than per
+        # flow on every /flows request
+        self.flow_stats[dpid] = {'priority': priority, 'pkts': pkts,
+                                 'bytes': byts, 'dur': dur,
+                                 'match': matches, 'actions': actions,
+                                 'switch_id': hex(dpid)}
+
+        # Feed the adaptive poller: relative packet-count movement on
+        # this switch since the previous snapshot
+        total = int(pkts.sum())
+        prev = self.prev_totals.get(dpid)
+        if prev is not None:
+            self.flow_deltas[dpid] = (total - prev) / prev if prev else float(total > 0)
+        self.prev_totals[dpid] = total
+        self.flow_gen += 1
+
+    @set_ev_cls([topo_event.EventSwitchEnter, topo_event.EventSwitchLeave,
+                 topo_event.EventLinkAdd, topo_event.EventLinkDelete,
+                 topo_event.EventHostAdd, topo_event.EventHostMove])
+    def _topology_changed(self, ev):
+        # Any of these invalidates the cached /topology/* bodies
+        self.topo_gen += 1
 
     def _collect_stats_periodically(self):
         while True:
             try:
                 for switch_info in self.switches.values():
                     self._request_stats(switch_info['datapath'])
-                time.sleep(2)
+                time.sleep(self.poll_interval)
+                self._adapt_poll_interval()
             except Exception as e:
                 self.logger.error(f"Error collecting stats: {e}")
-                time.sleep(2)
+                time.sleep(self.poll_interval)
+
+    def _adapt_poll_interval(self):
+        """Adjust the stats polling interval to observed traffic.
+
+        Polling every switch on a fixed 2s beat wastes OpenFlow round
+        trips on an idle network. When the busiest switch moved less
+        than POLL_DELTA_THRESHOLD since the last cycle the interval is
+        doubled (up to POLL_MAX); any larger jump halves it back down
+        (to POLL_MIN) so bursts are picked up quickly.
+        """
+        if not self.flow_deltas:
+            return
+        busiest = max(self.flow_deltas.values())
+        if busiest < self.POLL_DELTA_THRESHOLD:
+            self.poll_interval = min(self.POLL_MAX, self.poll_interval * 2)
+        else:
+            self.poll_interval = max(self.POLL_MIN, self.poll_interval / 2)
 
     def _request_stats(self, datapath):
         ofproto = datapath.ofproto
@@ -186,23 +313,60 @@ class FlowMonitorController(app_manager.RyuApp):
         datapath.send_msg(parser.OFPFlowStatsRequest(datapath))
         datapath.send_msg(parser.OFPPortStatsRequest(datapath, 0, ofproto.OFPP_ANY))
 
+    def get_traffic_rates(self):
+        """Packet/byte totals and rates over the sliding window."""
+        window_pkts = int(self.ring_pkts.sum())
+        window_bytes = int(self.ring_bytes.sum())
+        return {'window_sec': self.ring_window,
+                'packets': window_pkts,
+                'bytes': window_bytes,
+                'pps': window_pkts / self.ring_window,
+                'Bps': window_bytes / self.ring_window}
+
+    def get_flow_stats(self, dpid, with_switch_id=False):
+        """Materialize the stored counter columns back into flow dicts."""
+        cols = self.flow_stats.get(dpid)
+        if not cols:
+            return []
+        extra = {'switch_id': cols['switch_id']} if with_switch_id else {}
+        return [{'priority': int(p), 'match': m, 'actions': a,
+                 'packet_count': int(pc), 'byte_count': int(bc),
+                 'duration_sec': int(d), **extra}
+                for p, m, a, pc, bc, d in zip(
+                    cols['priority'], cols['match'], cols['actions'],
+                    cols['pkts'], cols['bytes'], cols['dur'])]
+
     def get_flow_stats_all(self):
-        all_flows = []
-        for dpid, flows in self.flow_stats.items():
-            for flow in flows:
-                flow['switch_id'] = hex(dpid)
-                all_flows.append(flow)
-        return all_flows
+        # Flat comprehension - no per-element append dispatch and no
+        # mutation of state shared with the stats thread
+        return [flow
+                for dpid in self.flow_stats
+                for flow in self.get_flow_stats(dpid, with_switch_id=True)]
 
 class FlowMonitorAPI(ControllerBase):
 
+    # Serialized response bodies keyed by endpoint, each tagged with the
+    # generation it was built from. Class-level because Ryu creates a
+    # fresh ControllerBase instance per request.
+    _body_cache = {}
+
     def __init__(self, req, link, data, **config):
         super().__init__(req, link, data, **config)
         self.controller = data
 
+    def _cached_body(self, key, gen, build):
+        """Reuse the serialized body for key until gen moves on."""
+        hit = self._body_cache.get(key)
+        if hit is not None and hit[0] == gen:
+            return hit[1]
+        body = _dumps(build())
+        self._body_cache[key] = (gen, body)
+        return body
+
     @route('api', '/flows', methods=['GET'])
     def list_flows(self, req, **kwargs):
-        body = json.dumps(self.controller.get_flow_stats_all()).encode('utf-8')
+        body = self._cached_body('flows', self.controller.flow_gen,
+                                 self.controller.get_flow_stats_all)
         return Response(content_type='application/json', body=body)
 
     @route('api', '/flows/{dpid}', methods=['GET'])
@@ -211,30 +375,59 @@ class FlowMonitorAPI(ControllerBase):
             dpid_int = int(dpid, 16)
             if dpid_int not in self.controller.flow_stats:
                 return Response(status=404)
-            body = json.dumps(self.controller.flow_stats[dpid_int]).encode('utf-8')
+            body = self._cached_body(('flows', dpid_int), self.controller.flow_gen,
+                                     lambda: self.controller.get_flow_stats(dpid_int))
             return Response(content_type='application/json', body=body)
         except (ValueError, KeyError):
             return Response(status=400)
 
+    @route('api', '/stats/rates', methods=['GET'])
+    def get_rates(self, req, **kwargs):
+        body = _dumps(self.controller.get_traffic_rates())
+        return Response(content_type='application/json', body=body)
+
+    @route('api', '/config', methods=['GET'])
+    def get_config(self, req, **kwargs):
+        body = _dumps({
+            'poll_interval': self.controller.poll_interval,
+            'poll_min': self.controller.POLL_MIN,
+            'poll_max': self.controller.POLL_MAX
+        })
+        return Response(content_type='application/json', body=body)
+
+    @route('api', '/config', methods=['PUT'])
+    def set_config(self, req, **kwargs):
+        try:
+            interval = float(json.loads(req.body)['poll_interval'])
+        except (ValueError, KeyError, TypeError):
+            return Response(status=400)
+        self.controller.poll_interval = min(
+            max(interval, self.controller.POLL_MIN), self.controller.POLL_MAX)
+        body = _dumps({'poll_interval': self.controller.poll_interval})
+        return Response(content_type='application/json', body=body)
+
     @route('api', '/hello', methods=['GET'])
     def hello_world(self, req, **kwargs):
-        body = json.dumps({"message": "Hello from Ryu Controller!"}).encode('utf-8')
+        body = _dumps({"message": "Hello from Ryu Controller!"})
         return Response(content_type='application/json', body=body)
 
     @route('api', '/topology/switches', methods=['GET'])
     def list_switches(self, req, **kwargs):
-        switches = get_switch(self.controller)
-        body = json.dumps([s.to_dict() for s in switches]).encode('utf-8')
+        body = self._cached_body(
+            'switches', self.controller.topo_gen,
+            lambda: [s.to_dict() for s in get_switch(self.controller)])
         return Response(content_type='application/json', body=body)
 
     @route('api', '/topology/links', methods=['GET'])
     def list_links(self, req, **kwargs):
-        links = get_link(self.controller)
-        body = json.dumps([l.to_dict() for l in links]).encode('utf-8')
+        body = self._cached_body(
+            'links', self.controller.topo_gen,
+            lambda: [l.to_dict() for l in get_link(self.controller)])
         return Response(content_type='application/json', body=body)
 
     @route('api', '/topology/hosts', methods=['GET'])
     def list_hosts(self, req, **kwargs):
-        hosts = get_host(self.controller)
-        body = json.dumps([h.to_dict() for h in hosts]).encode('utf-8')
+        body = self._cached_body(
+            'hosts', self.controller.topo_gen,
+            lambda: [h.to_dict() for h in get_host(self.controller)])
         return Response(content_type='application/json', body=body)
@@ -9,19 +9,44 @@ from ryu.controller import ofp_event
 from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.ofproto import ofproto_v1_3
-from ryu.lib.packet import packet, ethernet, ether_types, arp, ipv4, tcp, udp, icmp
+from ryu.lib.packet import ether_types, arp, icmp, in_proto
 from ryu.topology import event as topo_event
 from ryu.topology.api import get_switch, get_link, get_host
 from ryu.app.wsgi import WSGIApplication, route, ControllerBase
+from ryu.lib import hub
 
+import functools
 import json
+import logging
+import socket
+import struct
 import time
 import threading
-from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 from webob import Response
 import ipaddress
 
+# pytricia gives O(prefix-length) longest-prefix-match in C; fall back
+# to the pure-Python ipaddress scan when it is not installed
+try:
+    import pytricia
+except ImportError:
+    pytricia = None
+
+# orjson serializes straight to bytes in C; REST consumers here are
+# machines, so indented output is not worth the pure-Python encoder path
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+
+def _mac_str(mac_int):
+    """Colon-separated form of an integer MAC key."""
+    return ':'.join('%02x' % b for b in mac_int.to_bytes(6, 'big'))
+
 # Import standardized logging (with fallback for Ryu environment)
 try:
     from ..utils.logger import get_controller_logger
@@ -39,20 +64,39 @@ class L3RouterController(app_manager.RyuApp):
 
     def __init__(self, *args, **kwargs):
         super(L3RouterController, self).__init__(*args, **kwargs)
+        # Cached so per-packet debug logging costs one attribute probe
+        # when debug output is off
+        self._debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        # Flat (dpid, raw-MAC) -> port table: one hash probe per lookup
+        # instead of nested per-switch dicts
         self.mac_to_port = {}
         self.ip_to_mac = {}
         self.switches = {}
         self.links = {}
         self.flow_stats = defaultdict(dict)
         self.port_stats = defaultdict(dict)
-        self.activity_log = []
+        # /flows serves this pre-serialized snapshot; it is rebuilt under
+        # the lock whenever a stats reply lands, so the WSGI thread never
+        # iterates flow_stats while the OpenFlow thread is writing it
+        self._flow_stats_lock = threading.Lock()
+        self._flow_stats_snapshot = _dumps([])
+        self.activity_log = deque(maxlen=100)
         self.start_time = time.time()
         self.packet_count = 0
         self.byte_count = 0
 
-        # Cache for ARP probes to avoid excessive broadcasts
+        # Cache for ARP probes to avoid excessive broadcasts; monotonic
+        # timestamps, swept periodically so scanning traffic cannot grow
+        # it without bound
         self._arp_probe_cache = {}
+        self._arp_probe_last_gc = time.monotonic()
         self._discovered_hosts = set()
+        # (dpid, host_ip) pairs whose /32 rewrite flow is already installed
+        self._installed_host_flows = set()
+        # Memoized rewrite-action lists keyed by (dpid, subnet, mac, port);
+        # OXM action construction is dict-heavy, and the gateway rewrite
+        # for a destination never changes while it stays on the same port
+        self._action_cache = {}
 
         # Layer 3 routing configuration (matching 4-internetwork.py topology)
         self.subnet_gateways = {
@@ -61,6 +105,57 @@ class L3RouterController(app_manager.RyuApp):
             '192.168.0.0/24': {'gateway_ip': '192.168.0.254', 'gateway_mac': '00:00:00:00:30:01'}
         }
 
+        # Prefix trie for per-packet subnet lookups (None -> ipaddress fallback)
+        if pytricia is not None:
+            self._subnet_trie = pytricia.PyTricia(32)
+            for subnet_str in self.subnet_gateways:
+                self._subnet_trie[subnet_str] = subnet_str
+        else:
+            self._subnet_trie = None
+
+        # The dataplane shows the same few IPs over and over, so the
+        # steady-state subnet lookup is one C-level cache hit; malformed
+        # strings also stop paying the exception path on every repeat
+        self._subnet_of = functools.lru_cache(maxsize=4096)(self._subnet_lookup)
+
+        # Direct gateway-IP lookups instead of scanning subnet_gateways per packet
+        self._gateway_ip_to_mac = {info['gateway_ip']: info['gateway_mac']
+                                   for info in self.subnet_gateways.values()}
+
+        # Pre-packed 42-byte ARP frames, one per gateway, with the fixed
+        # fields (gateway src MAC/IP, ethertype, hw/proto sizes) already
+        # serialized. send_arp_reply/send_arp_request copy the template and
+        # patch only dst MAC, opcode, target MAC and target IP - no
+        # packet.Packet build/serialize per frame.
+        self._arp_templates = {}
+        self._gateway_mac_bytes = {}
+        for info in self.subnet_gateways.values():
+            gw_mac = bytes.fromhex(info['gateway_mac'].replace(':', ''))
+            gw_ip = socket.inet_aton(info['gateway_ip'])
+            buf = bytearray(42)
+            buf[6:12] = gw_mac
+            # ethertype, htype, ptype, hlen, plen, opcode (patched per frame)
+            struct.pack_into('!HHHBBH', buf, 12, 0x0806, 1, 0x0800, 6, 4, 0)
+            buf[22:28] = gw_mac
+            buf[28:32] = gw_ip
+            self._arp_templates[info['gateway_ip']] = buf
+            self._gateway_mac_bytes[info['gateway_ip']] = gw_mac
+
+        # Hosts expected on each subnet (4-internetwork.py topology),
+        # grouped once at startup; entries are dropped as hosts show up
+        # so discovery bursts shrink toward nothing
+        expected_hosts = ['10.0.0.1', '172.16.0.2', '172.16.0.3',
+                          '172.16.0.4', '172.16.0.5', '192.168.0.6']
+        self._pending_by_subnet = {}
+        for host_ip in expected_hosts:
+            host_subnet = self.get_subnet_for_ip(host_ip)
+            if host_subnet:
+                self._pending_by_subnet.setdefault(host_subnet, set()).add(host_ip)
+        # Last probe-burst time per subnet
+        self._subnet_probe_times = {}
+        # Rate limiter for the full ip_to_mac debug dump in route_packet
+        self._last_route_debug_dump = 0.0
+
         # Routing table - subnet to subnet routing
         self.routing_table = {}
         for subnet in self.subnet_gateways:
@@ -69,6 +164,11 @@ class L3RouterController(app_manager.RyuApp):
                 if subnet != other_subnet:
                     self.routing_table[subnet][other_subnet] = {'next_hop': self.subnet_gateways[other_subnet]['gateway_ip']}
 
+        # Neither structure changes after __init__, so serialize their
+        # REST bodies once and serve the bytes directly
+        self._routing_table_json = _dumps(self.routing_table)
+        self._subnets_json = _dumps(self.subnet_gateways)
+
         if 'wsgi' in kwargs:
             wsgi = kwargs['wsgi']
             wsgi.register(L3RouterAPI, self)
@@ -81,22 +181,55 @@ class L3RouterController(app_manager.RyuApp):
         except:
             self.std_logger = self.logger
             
-        self.stats_thread = threading.Thread(target=self._collect_stats_periodically)
-        self.stats_thread.daemon = True
-        self.stats_thread.start()
+        # Outgoing OpenFlow batching: non-latency-critical messages (flow
+        # mods, discovery probes) are serialized into a per-datapath
+        # buffer and flushed as one socket write, either when the batch
+        # fills or on the flush timer. Latency-sensitive sends (ARP
+        # replies, routed PacketOuts) stay on the direct send_msg path.
+        # The flush thread parks on _tx_pending while every batch is
+        # empty instead of polling on a timer.
+        self._tx_batches = {}
+        self._tx_pending = hub.Event()
+
+        # Precomputed ethertype dispatch: one dict probe instead of an
+        # if/elif chain per PacketIn; None means drop (LLDP)
+        self._eth_dispatch = {
+            ether_types.ETH_TYPE_ARP: self.handle_arp,
+            ether_types.ETH_TYPE_IP: self.handle_ip,
+            ether_types.ETH_TYPE_LLDP: None,
+        }
+
+        # hub.spawn yields to the eventlet scheduler during the sleep
+        # instead of parking a kernel thread the way threading.Thread +
+        # time.sleep would
+        self.stats_thread = hub.spawn(self._collect_stats_periodically)
+        self._tx_flush_thread = hub.spawn(self._flush_tx_batches)
         self.log_activity('info', 'L3 Router Controller started')
         self.std_logger.info('L3 Router Controller started with 4-subnet support')
 
-    def log_activity(self, level, message):
-        timestamp = datetime.now().strftime('%H:%M:%S')
+    def log_activity(self, level, message, *args):
+        # Hot paths pass printf-style args so debug entries are dropped
+        # before any string formatting when debug logging is off
+        if level == 'debug' and not self._debug_enabled:
+            return
+        if args:
+            message = message % args
+        timestamp = time.strftime('%H:%M:%S')
         entry = {'timestamp': timestamp, 'level': level, 'message': message}
         self.activity_log.append(entry)
-        if len(self.activity_log) > 100:
-            self.activity_log.pop(0)
         self.logger.info(f"[{level.upper()}] {message}")
 
     def get_subnet_for_ip(self, ip_address):
         """Determine which subnet an IP address belongs to"""
+        return self._subnet_of(ip_address)
+
+    def _subnet_lookup(self, ip_address):
+        """Uncached lookup behind the per-IP LRU cache in get_subnet_for_ip"""
+        if self._subnet_trie is not None:
+            try:
+                return self._subnet_trie.get(ip_address)
+            except ValueError:
+                return None
         try:
             ip_obj = ipaddress.ip_address(ip_address)
             for subnet_str in self.subnet_gateways:
@@ -114,6 +247,23 @@ class L3RouterController(app_manager.RyuApp):
         parser = datapath.ofproto_parser
         dpid = datapath.id
 
+        # A reconnect (mn -c / relaunch) delivers a fresh Datapath with
+        # the same dpid. Drop any batch entry holding the dead
+        # connection's Datapath - its send() silently discards buffers -
+        # so the flow mods below go out on the live socket.
+        self._tx_batches.pop(dpid, None)
+
+        # The reconnected switch comes back with an empty flow table, so
+        # forget which /32 rewrite flows it had - otherwise the dedup set
+        # suppresses every reinstall and inter-subnet traffic is stuck on
+        # the per-packet PacketOut path. Cached action lists embed parser
+        # objects from the old connection, so drop those too.
+        self._installed_host_flows = {
+            key for key in self._installed_host_flows if key[0] != dpid}
+        self._action_cache = {
+            key: actions for key, actions in self._action_cache.items()
+            if key[0] != dpid}
+
         self.switches[dpid] = {
             'datapath': datapath,
             'ports': {},
@@ -125,198 +275,271 @@ class L3RouterController(app_manager.RyuApp):
         match = parser.OFPMatch()
         actions = [parser.OFPActionOutput(ofproto.OFPP_CONTROLLER, ofproto.OFPCML_NO_BUFFER)]
         self.add_flow(datapath, 0, match, actions)
+
+        # Proactive L3 rules so steady-state traffic never leaves the
+        # dataplane. Per subnet:
+        #   prio 20: ICMP to the gateway IP -> controller (ping proxy)
+        #   prio  8: frames addressed to the gateway MAC -> controller
+        #            (inter-subnet traffic without a /32 host flow yet)
+        #   prio  5: ipv4_dst in subnet -> NORMAL (intra-subnet at line rate)
+        # Per-host /32 rewrite flows (prio 10) are installed lazily as
+        # soon as handle_arp learns a host MAC.
+        to_controller = [parser.OFPActionOutput(ofproto.OFPP_CONTROLLER,
+                                                ofproto.OFPCML_NO_BUFFER)]
+        for subnet_str, info in self.subnet_gateways.items():
+            net = ipaddress.ip_network(subnet_str)
+            match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                    ip_proto=in_proto.IPPROTO_ICMP,
+                                    ipv4_dst=info['gateway_ip'])
+            self.add_flow(datapath, 20, match, to_controller)
+            match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                    eth_dst=info['gateway_mac'])
+            self.add_flow(datapath, 8, match, to_controller)
+            match = parser.OFPMatch(
+                eth_type=ether_types.ETH_TYPE_IP,
+                ipv4_dst=(str(net.network_address), str(net.netmask)))
+            self.add_flow(datapath, 5, match,
+                          [parser.OFPActionOutput(ofproto.OFPP_NORMAL)])
+
         self.log_activity('info', f'Switch {hex(dpid)} connected with L3 routing support')
 
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def packet_in_handler(self, ev):
         msg = ev.msg
-        datapath = msg.datapath
-        ofproto = datapath.ofproto
-        parser = datapath.ofproto_parser
         in_port = msg.match['in_port']
-        dpid = datapath.id
-
-        pkt = packet.Packet(msg.data)
-        eth = pkt.get_protocols(ethernet.ethernet)[0]
+        dpid = msg.datapath.id
+        data = msg.data
+
+        # Peek at the headers with struct instead of packet.Packet -
+        # the full ryu parse allocates an object per protocol layer even
+        # when all we need is the ethertype and MACs to dispatch. MACs
+        # become plain integers, which hash in one machine word; the
+        # colon form only exists in logs and OpenFlow message fields.
+        if len(data) < 14:
+            return
+        ethertype = struct.unpack_from('!H', data, 12)[0]
 
-        if eth.ethertype == ether_types.ETH_TYPE_LLDP:
+        handler = self._eth_dispatch.get(ethertype, self._l2_switch_fallback)
+        if handler is None:
             return
 
-        dst = eth.dst
-        src = eth.src
+        src = int.from_bytes(data[6:12], 'big')
 
         self.packet_count += 1
-        self.byte_count += len(msg.data)
+        self.byte_count += len(data)
 
-        self.mac_to_port.setdefault(dpid, {})
-        self.mac_to_port[dpid][src] = in_port
-        
-        # Debug packet reception
-        if eth.ethertype == ether_types.ETH_TYPE_ARP:
-            self.log_activity('debug', f'PACKET_IN: ARP packet {src} -> {dst} on port {in_port}')
-        elif eth.ethertype == ether_types.ETH_TYPE_IP:
-            ip_pkt = pkt.get_protocol(ipv4.ipv4)
-            if ip_pkt:
-                self.log_activity('debug', f'PACKET_IN: IP packet {ip_pkt.src} -> {ip_pkt.dst} (MAC: {src} -> {dst}) on port {in_port}')
-
-        # Handle ARP packets
-        if eth.ethertype == ether_types.ETH_TYPE_ARP:
-            self.handle_arp(datapath, in_port, eth, pkt)
-            return
+        self.mac_to_port[(dpid, src)] = in_port
 
-        # Handle IP packets
-        elif eth.ethertype == ether_types.ETH_TYPE_IP:
-            ip_pkt = pkt.get_protocol(ipv4.ipv4)
-            if ip_pkt:
-                self.handle_ip(datapath, in_port, eth, ip_pkt, pkt)
-                return
+        handler(msg, in_port, dpid, src)
 
-        # Default L2 switching for other packets
-        self.log_activity('debug', f'PACKET_IN: L2 switching for {src} -> {dst} (ethertype: {hex(eth.ethertype)})')
-        out_port = self.mac_to_port[dpid].get(dst, ofproto.OFPP_FLOOD)
+    def _l2_switch_fallback(self, msg, in_port, dpid, src):
+        """Default L2 switching for ethertypes without a dedicated handler"""
+        datapath = msg.datapath
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        data = msg.data
+        dst = int.from_bytes(data[0:6], 'big')
+
+        if self._debug_enabled:
+            self.log_activity('debug', 'PACKET_IN: L2 switching for %s -> %s (ethertype: %#x)',
+                              _mac_str(src), _mac_str(dst),
+                              struct.unpack_from('!H', data, 12)[0])
+        out_port = self.mac_to_port.get((dpid, dst), ofproto.OFPP_FLOOD)
         actions = [parser.OFPActionOutput(out_port)]
 
         if out_port != ofproto.OFPP_FLOOD:
-            match = parser.OFPMatch(in_port=in_port, eth_dst=dst, eth_src=src)
+            match = parser.OFPMatch(in_port=in_port, eth_dst=_mac_str(dst),
+                                    eth_src=_mac_str(src))
             if msg.buffer_id != ofproto.OFP_NO_BUFFER:
                 self.add_flow(datapath, 1, match, actions, msg.buffer_id)
             else:
                 self.add_flow(datapath, 1, match, actions)
 
-        data = msg.data if msg.buffer_id == ofproto.OFP_NO_BUFFER else None
-        out = parser.OFPPacketOut(datapath=datapath, buffer_id=msg.buffer_id, 
-                                 in_port=in_port, actions=actions, data=data)
+        out_data = data if msg.buffer_id == ofproto.OFP_NO_BUFFER else None
+        out = parser.OFPPacketOut(datapath=datapath, buffer_id=msg.buffer_id,
+                                 in_port=in_port, actions=actions, data=out_data)
         datapath.send_msg(out)
 
-    def handle_arp(self, datapath, in_port, eth_pkt, pkt):
+    def handle_arp(self, msg, in_port, dpid, src):
         """Handle ARP packets with gateway proxy functionality"""
-        arp_pkt = pkt.get_protocol(arp.arp)
-        if not arp_pkt:
+        datapath = msg.datapath
+        data = msg.data
+        if len(data) < 42:
             return
+        opcode = struct.unpack_from('!H', data, 20)[0]
+        src_mac = int.from_bytes(data[22:28], 'big')
+        src_ip = socket.inet_ntoa(data[28:32])
+        target_ip = socket.inet_ntoa(data[38:42])
+
+        # Learn IP to MAC mapping (integer form) and mark as discovered
+        self.ip_to_mac[src_ip] = src_mac
+        if self._debug_enabled:
+            self.log_activity('debug', 'ARP: Learned %s -> %s',
+                              src_ip, _mac_str(src_mac))
+        self._install_host_flow(datapath, in_port, src_ip, src_mac)
 
-        # Learn IP to MAC mapping and mark as discovered
-        self.ip_to_mac[arp_pkt.src_ip] = arp_pkt.src_mac
-        self.log_activity('debug', f'ARP: Learned {arp_pkt.src_ip} -> {arp_pkt.src_mac}')
-        
-        if arp_pkt.src_ip not in self._discovered_hosts:
-            self._discovered_hosts.add(arp_pkt.src_ip)
-            self.log_activity('info', f'HOST DISCOVERED via ARP: {arp_pkt.src_ip} at {arp_pkt.src_mac}')
-            src_subnet = self.get_subnet_for_ip(arp_pkt.src_ip)
+        if src_ip not in self._discovered_hosts:
+            self._discovered_hosts.add(src_ip)
+            self.log_activity('info', f'HOST DISCOVERED via ARP: {src_ip} at {_mac_str(src_mac)}')
+            src_subnet = self.get_subnet_for_ip(src_ip)
             if src_subnet:
                 self._trigger_host_discovery(datapath, src_subnet)
 
-        if arp_pkt.opcode == arp.ARP_REQUEST:
+        if opcode == arp.ARP_REQUEST:
             # Check if this is a request for one of our gateway IPs
-            target_ip = arp_pkt.dst_ip
-            gateway_mac = None
-            
-            self.log_activity('debug', f'ARP REQUEST: {arp_pkt.src_ip} ({arp_pkt.src_mac}) asking for {target_ip}')
-            
-            for subnet_info in self.subnet_gateways.values():
-                if target_ip == subnet_info['gateway_ip']:
-                    gateway_mac = subnet_info['gateway_mac']
-                    break
+            if self._debug_enabled:
+                self.log_activity('debug', 'ARP REQUEST: %s (%s) asking for %s',
+                                  src_ip, _mac_str(src_mac), target_ip)
+
+            gateway_mac = self._gateway_ip_to_mac.get(target_ip)
 
             if gateway_mac:
                 # Send ARP reply as gateway
                 self.send_arp_reply(datapath, in_port, gateway_mac, target_ip,
-                                  arp_pkt.src_mac, arp_pkt.src_ip)
-                self.log_activity('debug', f'ARP REPLY sent: {target_ip} is at {gateway_mac} (gateway proxy)')
+                                  src_mac, src_ip)
+                self.log_activity('debug', 'ARP REPLY sent: %s is at %s (gateway proxy)',
+                                  target_ip, gateway_mac)
             else:
                 # Forward ARP request normally for non-gateway IPs
-                self.log_activity('debug', f'ARP REQUEST forwarded: {target_ip} is not a gateway IP')
-                self.forward_packet(datapath, in_port, pkt)
-        elif arp_pkt.opcode == arp.ARP_REPLY:
-            self.log_activity('debug', f'ARP REPLY received: {arp_pkt.src_ip} is at {arp_pkt.src_mac}')
+                self.log_activity('debug', 'ARP REQUEST forwarded: %s is not a gateway IP',
+                                  target_ip)
+                self.forward_packet(datapath, in_port, data)
+        elif opcode == arp.ARP_REPLY:
+            if self._debug_enabled:
+                self.log_activity('debug', 'ARP REPLY received: %s is at %s',
+                                  src_ip, _mac_str(src_mac))
             # Forward ARP replies normally
-            self.forward_packet(datapath, in_port, pkt)
+            self.forward_packet(datapath, in_port, data)
 
-    def handle_ip(self, datapath, in_port, eth_pkt, ip_pkt, pkt):
+    def handle_ip(self, msg, in_port, dpid, src_mac):
         """Handle IP packets with inter-subnet routing"""
-        src_ip = ip_pkt.src
-        dst_ip = ip_pkt.dst
+        datapath = msg.datapath
+        data = msg.data
+        if len(data) < 34:
+            return
+        src_ip = socket.inet_ntoa(data[26:30])
+        dst_ip = socket.inet_ntoa(data[30:34])
 
         # Learn IP to MAC mapping and discover new hosts
-        self.ip_to_mac[src_ip] = eth_pkt.src
-        self.log_activity('debug', f'IP: Learned {src_ip} -> {eth_pkt.src}')
-        
+        self.ip_to_mac[src_ip] = src_mac
+        if self._debug_enabled:
+            self.log_activity('debug', 'IP: Learned %s -> %s',
+                              src_ip, _mac_str(src_mac))
+
+        src_subnet = self.get_subnet_for_ip(src_ip)
+        dst_subnet = self.get_subnet_for_ip(dst_ip)
+
         # Mark host as discovered and potentially trigger discovery of other hosts
         if src_ip not in self._discovered_hosts:
             self._discovered_hosts.add(src_ip)
-            self.log_activity('info', f'HOST DISCOVERED: {src_ip} at {eth_pkt.src}')
+            self.log_activity('info', f'HOST DISCOVERED: {src_ip} at {_mac_str(src_mac)}')
             # Trigger discovery of other hosts in different subnets
             self._trigger_host_discovery(datapath, src_subnet)
 
-        src_subnet = self.get_subnet_for_ip(src_ip)
-        dst_subnet = self.get_subnet_for_ip(dst_ip)
-
-        self.log_activity('debug', f'IP PACKET: {src_ip} ({src_subnet}) -> {dst_ip} ({dst_subnet}) proto={ip_pkt.proto}')
+        self.log_activity('debug', 'IP PACKET: %s (%s) -> %s (%s) proto=%s',
+                          src_ip, src_subnet, dst_ip, dst_subnet, data[23])
 
         if not src_subnet or not dst_subnet:
             # Unknown subnet, forward normally
             self.log_activity('warning', f'Unknown subnet: src={src_subnet}, dst={dst_subnet} - forwarding normally')
-            self.forward_packet(datapath, in_port, pkt)
+            self.forward_packet(datapath, in_port, data)
             return
 
         # Check if this is a ping to the gateway
-        is_gateway_ping = False
-        for subnet_info in self.subnet_gateways.values():
-            if dst_ip == subnet_info['gateway_ip']:
-                is_gateway_ping = True
-                break
-        
+        is_gateway_ping = dst_ip in self._gateway_ip_to_mac
+
         if is_gateway_ping:
             # Handle ping to gateway - respond with ICMP echo reply
-            self.log_activity('debug', f'Gateway PING: {src_ip} -> {dst_ip} (responding as gateway)')
-            self._handle_gateway_ping(datapath, in_port, eth_pkt, ip_pkt, pkt)
+            self.log_activity('debug', 'Gateway PING: %s -> %s (responding as gateway)',
+                              src_ip, dst_ip)
+            self._handle_gateway_ping(datapath, in_port, data, src_ip, dst_ip)
         elif src_subnet == dst_subnet:
             # Same subnet - L2 switching
-            self.log_activity('debug', f'Same subnet {src_subnet} - L2 switching')
-            self.forward_packet(datapath, in_port, pkt)
+            self.log_activity('debug', 'Same subnet %s - L2 switching', src_subnet)
+            self.forward_packet(datapath, in_port, data)
         else:
             # Inter-subnet routing required
-            self.log_activity('debug', f'Inter-subnet routing: {src_subnet} -> {dst_subnet}')
-            self.route_packet(datapath, in_port, eth_pkt, ip_pkt, pkt, src_subnet, dst_subnet)
-
-    def route_packet(self, datapath, in_port, eth_pkt, ip_pkt, pkt, src_subnet, dst_subnet):
+            self.log_activity('debug', 'Inter-subnet routing: %s -> %s',
+                              src_subnet, dst_subnet)
+            self.route_packet(datapath, in_port, data, dst_ip, src_subnet, dst_subnet)
+
+    def _install_host_flow(self, datapath, out_port, host_ip, host_mac):
+        """Install the /32 gateway-rewrite flow for a freshly learned host"""
+        key = (datapath.id, host_ip)
+        if key in self._installed_host_flows:
+            return
+        host_subnet = self.get_subnet_for_ip(host_ip)
+        if not host_subnet:
+            return
+        self._installed_host_flows.add(key)
+        parser = datapath.ofproto_parser
+        match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                ipv4_dst=host_ip)
+        actions = [parser.OFPActionSetField(eth_dst=_mac_str(host_mac)),
+                   parser.OFPActionSetField(
+                       eth_src=self.subnet_gateways[host_subnet]['gateway_mac']),
+                   parser.OFPActionOutput(out_port)]
+        self.add_flow(datapath, 10, match, actions)
+        self.log_activity('debug', 'Proactive /32 flow: %s -> port %s',
+                          host_ip, out_port)
+
+    def route_packet(self, datapath, in_port, data, dst_ip, src_subnet, dst_subnet):
         """Route packet between subnets"""
-        dst_ip = ip_pkt.dst
-        
-        self.log_activity('debug', f'ROUTING: Attempting to route {dst_ip} from {src_subnet} to {dst_subnet}')
-        self.log_activity('debug', f'ROUTING: Known IP-MAC mappings: {dict(list(self.ip_to_mac.items()))}')
-        
+        self.log_activity('debug', 'ROUTING: Attempting to route %s from %s to %s',
+                          dst_ip, src_subnet, dst_subnet)
+        # Stringifying the whole table per routed packet amplifies debug
+        # cost by the table size - dump it at most once a second
+        if self._debug_enabled:
+            dump_now = time.monotonic()
+            if dump_now - self._last_route_debug_dump > 1.0:
+                self._last_route_debug_dump = dump_now
+                self.log_activity('debug', 'ROUTING: Known IP-MAC mappings: %s',
+                                  {ip: _mac_str(m) for ip, m in self.ip_to_mac.items()})
+
         # Check if we know the destination MAC
         if dst_ip in self.ip_to_mac:
             dst_mac = self.ip_to_mac[dst_ip]
             # Find output port for destination MAC
             dpid = datapath.id
-            out_port = self.mac_to_port.get(dpid, {}).get(dst_mac)
-            
-            self.log_activity('debug', f'ROUTING: {dst_ip} -> MAC {dst_mac}, out_port={out_port}')
-            
+            out_port = self.mac_to_port.get((dpid, dst_mac))
+
+            if self._debug_enabled:
+                self.log_activity('debug', 'ROUTING: %s -> MAC %s, out_port=%s',
+                                  dst_ip, _mac_str(dst_mac), out_port)
+
             if out_port:
-                # Install flow rule for this route
                 parser = datapath.ofproto_parser
-                match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
-                                      ipv4_dst=dst_ip)
                 gateway_mac = self.subnet_gateways[dst_subnet]['gateway_mac']
-                actions = [parser.OFPActionSetField(eth_dst=dst_mac),
-                          parser.OFPActionSetField(eth_src=gateway_mac),
-                          parser.OFPActionOutput(out_port)]
-                self.add_flow(datapath, 10, match, actions)
-                
+
+                cache_key = (dpid, dst_subnet, dst_mac, out_port)
+                actions = self._action_cache.get(cache_key)
+                if actions is None:
+                    actions = [parser.OFPActionSetField(eth_dst=_mac_str(dst_mac)),
+                               parser.OFPActionSetField(eth_src=gateway_mac),
+                               parser.OFPActionOutput(out_port)]
+                    self._action_cache[cache_key] = actions
+
+                # Install the flow rule for this route once per switch
+                flow_key = (dpid, dst_ip)
+                if flow_key not in self._installed_host_flows:
+                    self._installed_host_flows.add(flow_key)
+                    match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                          ipv4_dst=dst_ip)
+                    self.add_flow(datapath, 10, match, actions)
+
                 # Forward current packet
-                data = pkt.data if hasattr(pkt, 'data') else None
                 out = parser.OFPPacketOut(datapath=datapath, buffer_id=datapath.ofproto.OFP_NO_BUFFER,
                                         in_port=in_port, actions=actions, data=data)
                 datapath.send_msg(out)
-                self.log_activity('debug', f'ROUTING: Successfully routed {dst_ip} via {gateway_mac} to port {out_port}')
+                self.log_activity('debug', 'ROUTING: Successfully routed %s via %s to port %s',
+                                  dst_ip, gateway_mac, out_port)
                 return
             else:
-                self.log_activity('warning', f'ROUTING: No output port found for MAC {dst_mac}')
+                self.log_activity('warning', f'ROUTING: No output port found for MAC {_mac_str(dst_mac)}')
 
         # Destination MAC unknown: try broadcasting to find the host
-        self.log_activity('debug', f'ROUTING: {dst_ip} MAC unknown, trying broadcast discovery')
+        self.log_activity('debug', 'ROUTING: %s MAC unknown, trying broadcast discovery',
+                          dst_ip)
         
         # For now, let's try a simpler approach - broadcast the packet to all ports
         # This is less efficient but should work for initial connectivity
@@ -325,59 +548,67 @@ class L3RouterController(app_manager.RyuApp):
         
         # Create a broadcast action to find the destination
         actions = [parser.OFPActionOutput(ofproto.OFPP_FLOOD)]
-        
+
         # Send the packet via broadcast
-        data = pkt.data if hasattr(pkt, 'data') else None
         out = parser.OFPPacketOut(datapath=datapath, buffer_id=ofproto.OFP_NO_BUFFER,
                                 in_port=in_port, actions=actions, data=data)
         datapath.send_msg(out)
-        self.log_activity('debug', f'ROUTING: Broadcasting packet to {dst_ip} for discovery')
+        self.log_activity('debug', 'ROUTING: Broadcasting packet to %s for discovery',
+                          dst_ip)
         
         # Also send ARP probe for future packets
         try:
-            now = time.time()
+            now = time.monotonic()
             last_probe = self._arp_probe_cache.get(dst_ip, 0)
             if now - last_probe > 1.0:
                 self.send_arp_request(datapath, dst_subnet, dst_ip)
                 self._arp_probe_cache[dst_ip] = now
-                self.log_activity('debug', f'ROUTING: Sent ARP probe for {dst_ip} on {dst_subnet}')
+                self.log_activity('debug', 'ROUTING: Sent ARP probe for %s on %s',
+                                  dst_ip, dst_subnet)
+            # Sweep stale entries every 30s so one-off scan targets do
+            # not accumulate forever
+            if now - self._arp_probe_last_gc > 30.0:
+                self._arp_probe_last_gc = now
+                cutoff = now - 60.0
+                self._arp_probe_cache = {ip: t for ip, t in self._arp_probe_cache.items()
+                                         if t > cutoff}
         except Exception as e:
             self.log_activity('warning', f'ROUTING: Failed to send ARP probe for {dst_ip}: {e}')
         
         return
 
-    def forward_packet(self, datapath, in_port, pkt):
+    def forward_packet(self, datapath, in_port, data):
         """Forward packet using L2 switching"""
-        eth_pkt = pkt.get_protocols(ethernet.ethernet)[0]
-        dst = eth_pkt.dst
+        dst = int.from_bytes(data[0:6], 'big')
         dpid = datapath.id
-        
-        out_port = self.mac_to_port.get(dpid, {}).get(dst, datapath.ofproto.OFPP_FLOOD)
+
+        out_port = self.mac_to_port.get((dpid, dst), datapath.ofproto.OFPP_FLOOD)
         actions = [datapath.ofproto_parser.OFPActionOutput(out_port)]
-        
-        data = pkt.data if hasattr(pkt, 'data') else None
+
         out = datapath.ofproto_parser.OFPPacketOut(
             datapath=datapath, buffer_id=datapath.ofproto.OFP_NO_BUFFER,
             in_port=in_port, actions=actions, data=data)
         datapath.send_msg(out)
 
     def send_arp_reply(self, datapath, in_port, src_mac, src_ip, dst_mac, dst_ip):
-        """Send ARP reply packet"""
+        """Send ARP reply packet from a gateway template (dst_mac is an int)"""
         parser = datapath.ofproto_parser
-        
-        # Create ARP reply packet
-        arp_reply = packet.Packet()
-        arp_reply.add_protocol(ethernet.ethernet(ethertype=ether_types.ETH_TYPE_ARP,
-                                                dst=dst_mac, src=src_mac))
-        arp_reply.add_protocol(arp.arp(opcode=arp.ARP_REPLY, src_mac=src_mac, src_ip=src_ip,
-                                     dst_mac=dst_mac, dst_ip=dst_ip))
-        arp_reply.serialize()
-        
+
+        tmpl = self._arp_templates.get(src_ip)
+        if tmpl is None:
+            return
+        frame = bytearray(tmpl)
+        dst_mac_bytes = dst_mac.to_bytes(6, 'big')
+        frame[0:6] = dst_mac_bytes
+        struct.pack_into('!H', frame, 20, arp.ARP_REPLY)
+        frame[32:38] = dst_mac_bytes
+        frame[38:42] = socket.inet_aton(dst_ip)
+
         actions = [parser.OFPActionOutput(in_port)]
         out = parser.OFPPacketOut(datapath=datapath,
                                 buffer_id=datapath.ofproto.OFP_NO_BUFFER,
                                 in_port=datapath.ofproto.OFPP_CONTROLLER,
-                                actions=actions, data=arp_reply.data)
+                                actions=actions, data=bytes(frame))
         datapath.send_msg(out)
 
     def send_arp_request(self, datapath, dst_subnet, target_ip):
@@ -388,23 +619,12 @@ class L3RouterController(app_manager.RyuApp):
         gw_info = self.subnet_gateways.get(dst_subnet)
         if not gw_info:
             return
-        gateway_ip = gw_info['gateway_ip']
-        gateway_mac = gw_info['gateway_mac']
-
-        arp_req = packet.Packet()
-        arp_req.add_protocol(ethernet.ethernet(
-            ethertype=ether_types.ETH_TYPE_ARP,
-            dst='ff:ff:ff:ff:ff:ff',
-            src=gateway_mac
-        ))
-        arp_req.add_protocol(arp.arp(
-            opcode=arp.ARP_REQUEST,
-            src_mac=gateway_mac,
-            src_ip=gateway_ip,
-            dst_mac='00:00:00:00:00:00',
-            dst_ip=target_ip
-        ))
-        arp_req.serialize()
+
+        frame = bytearray(self._arp_templates[gw_info['gateway_ip']])
+        frame[0:6] = b'\xff\xff\xff\xff\xff\xff'
+        struct.pack_into('!H', frame, 20, arp.ARP_REQUEST)
+        # target MAC stays all-zero from the template
+        frame[38:42] = socket.inet_aton(target_ip)
 
         actions = [parser.OFPActionOutput(ofproto.OFPP_FLOOD)]
         out = parser.OFPPacketOut(
@@ -412,7 +632,7 @@ class L3RouterController(app_manager.RyuApp):
             buffer_id=ofproto.OFP_NO_BUFFER,
             in_port=ofproto.OFPP_CONTROLLER,
             actions=actions,
-            data=arp_req.data
+            data=bytes(frame)
         )
         datapath.send_msg(out)
 
@@ -424,89 +644,131 @@ class L3RouterController(app_manager.RyuApp):
         if buffer_id:
             mod_kwargs['buffer_id'] = buffer_id
         mod = parser.OFPFlowMod(**mod_kwargs)
-        datapath.send_msg(mod)
+        self._send_batched(datapath, mod)
+
+    _TX_BATCH_MAX = 32
+    _TX_FLUSH_INTERVAL = 0.001
+
+    def _send_batched(self, datapath, msg):
+        """Queue an OpenFlow message for the next batched socket write"""
+        datapath.set_xid(msg)
+        msg.serialize()
+        entry = self._tx_batches.get(datapath.id)
+        if entry is None:
+            entry = (datapath, [])
+            self._tx_batches[datapath.id] = entry
+        entry[1].append(bytes(msg.buf))
+        if len(entry[1]) >= self._TX_BATCH_MAX:
+            self._flush_tx_entry(entry)
+        else:
+            self._tx_pending.set()
+
+    def _flush_tx_entry(self, entry):
+        datapath, bufs = entry
+        if not bufs:
+            return
+        data = b''.join(bufs)
+        del bufs[:]
+        try:
+            datapath.send(data)
+        except Exception as e:
+            self.log_activity('warning', f'TX batch to {hex(datapath.id)} failed: {e}')
 
-    def _handle_gateway_ping(self, datapath, in_port, eth_pkt, ip_pkt, pkt):
+    def _flush_tx_batches(self):
+        """Drain pending per-datapath batches on a short latency bound.
+
+        Parks on _tx_pending while nothing is queued, so an idle
+        controller pays no periodic wakeups; a queued message wakes the
+        loop, which then waits one flush interval for more messages to
+        accumulate before draining every batch.
+        """
+        while True:
+            self._tx_pending.wait()
+            hub.sleep(self._TX_FLUSH_INTERVAL)
+            self._tx_pending.clear()
+            for entry in list(self._tx_batches.values()):
+                self._flush_tx_entry(entry)
+
+    def _handle_gateway_ping(self, datapath, in_port, data, src_ip, dst_ip):
         """Handle ICMP ping to gateway - respond with echo reply"""
         try:
-            from ryu.lib.packet import icmp
-            
-            # Parse the ICMP packet
-            icmp_pkt = pkt.get_protocol(icmp.icmp)
-            if not icmp_pkt or icmp_pkt.type != icmp.ICMP_ECHO_REQUEST:
-                self.log_activity('debug', f'Not an ICMP echo request, ignoring')
+            gw_mac_bytes = self._gateway_mac_bytes.get(dst_ip)
+            if not gw_mac_bytes:
+                self.log_activity('warning', f'No gateway MAC found for {dst_ip}')
                 return
-            
-            # Find the appropriate gateway MAC for the destination
-            gateway_mac = None
-            for subnet_info in self.subnet_gateways.values():
-                if ip_pkt.dst == subnet_info['gateway_ip']:
-                    gateway_mac = subnet_info['gateway_mac']
-                    break
-            
-            if not gateway_mac:
-                self.log_activity('warning', f'No gateway MAC found for {ip_pkt.dst}')
+
+            # The echo reply is the request with MACs and IPs swapped and
+            # the ICMP type flipped 8 -> 0, so mutate a copy of the raw
+            # frame in place instead of rebuilding and re-serializing a
+            # packet.Packet. The payload rides along untouched.
+            frame = bytearray(data)
+            icmp_off = 14 + (frame[14] & 0x0f) * 4
+            if len(frame) < icmp_off + 4 or frame[icmp_off] != icmp.ICMP_ECHO_REQUEST:
+                self.log_activity('debug', 'Not an ICMP echo request, ignoring')
                 return
-            
-            # Create ICMP echo reply
+
+            frame[0:6] = frame[6:12]
+            frame[6:12] = gw_mac_bytes
+            # Swapping src/dst leaves the IP header checksum valid
+            frame[26:30], frame[30:34] = frame[30:34], frame[26:30]
+            # Type 8 -> 0 lowers the checksummed word by 0x0800; patch the
+            # one's-complement sum incrementally (RFC 1624)
+            frame[icmp_off] = icmp.ICMP_ECHO_REPLY
+            csum = struct.unpack_from('!H', frame, icmp_off + 2)[0] + 0x0800
+            struct.pack_into('!H', frame, icmp_off + 2,
+                             (csum & 0xffff) + (csum >> 16))
+
             parser = datapath.ofproto_parser
-            
-            # Create the reply packet
-            reply_pkt = packet.Packet()
-            reply_pkt.add_protocol(ethernet.ethernet(
-                ethertype=ether_types.ETH_TYPE_IP,
-                dst=eth_pkt.src,
-                src=gateway_mac
-            ))
-            reply_pkt.add_protocol(ipv4.ipv4(
-                dst=ip_pkt.src,
-                src=ip_pkt.dst,
-                proto=ip_pkt.proto
-            ))
-            reply_pkt.add_protocol(icmp.icmp(
-                type_=icmp.ICMP_ECHO_REPLY,
-                code=icmp_pkt.code,
-                csum=0,
-                data=icmp_pkt.data
-            ))
-            reply_pkt.serialize()
-            
-            # Send the reply
             actions = [parser.OFPActionOutput(in_port)]
             out = parser.OFPPacketOut(
                 datapath=datapath,
                 buffer_id=datapath.ofproto.OFP_NO_BUFFER,
                 in_port=datapath.ofproto.OFPP_CONTROLLER,
                 actions=actions,
-                data=reply_pkt.data
+                data=bytes(frame)
             )
             datapath.send_msg(out)
-            self.log_activity('debug', f'ICMP echo reply sent to {ip_pkt.src}')
-            
+            self.log_activity('debug', 'ICMP echo reply sent to %s', src_ip)
+
         except Exception as e:
             self.log_activity('warning', f'Failed to handle gateway ping: {e}')
     
     def _trigger_host_discovery(self, datapath, discovered_subnet):
-        """Proactively discover hosts in other subnets"""
-        expected_hosts = [
-            '10.0.0.1',      # h1
-            '172.16.0.2',    # h2
-            '172.16.0.3',    # h3
-            '172.16.0.4',    # h4
-            '172.16.0.5',    # h5
-            '192.168.0.6'    # h6
-        ]
-        
-        for host_ip in expected_hosts:
-            if host_ip not in self.ip_to_mac and host_ip not in self._discovered_hosts:
-                host_subnet = self.get_subnet_for_ip(host_ip)
-                if host_subnet and host_subnet != discovered_subnet:
-                    # Send ARP request to discover this host
-                    try:
-                        self.log_activity('debug', f'DISCOVERY: Probing for {host_ip} in {host_subnet}')
-                        self.send_arp_request(datapath, host_subnet, host_ip)
-                    except Exception as e:
-                        self.log_activity('warning', f'DISCOVERY: Failed to probe {host_ip}: {e}')
+        """Proactively probe still-unknown hosts in the other subnets"""
+        now = time.monotonic()
+        for subnet, pending in self._pending_by_subnet.items():
+            if subnet == discovered_subnet or not pending:
+                continue
+            # Forget anything that has shown up since the last burst
+            pending.difference_update(self._discovered_hosts)
+            if not pending:
+                continue
+            # At most one burst per subnet per second
+            if now - self._subnet_probe_times.get(subnet, 0) < 1.0:
+                continue
+            self._subnet_probe_times[subnet] = now
+            try:
+                self._arp_burst(datapath, subnet, pending)
+            except Exception as e:
+                self.log_activity('warning', f'DISCOVERY: Probe burst for {subnet} failed: {e}')
+
+    def _arp_burst(self, datapath, subnet, targets):
+        """Probe a batch of targets on one subnet, reusing a single frame"""
+        parser = datapath.ofproto_parser
+        ofproto = datapath.ofproto
+        frame = bytearray(self._arp_templates[self.subnet_gateways[subnet]['gateway_ip']])
+        frame[0:6] = b'\xff\xff\xff\xff\xff\xff'
+        struct.pack_into('!H', frame, 20, arp.ARP_REQUEST)
+        actions = [parser.OFPActionOutput(ofproto.OFPP_FLOOD)]
+        for target_ip in targets:
+            frame[38:42] = socket.inet_aton(target_ip)
+            out = parser.OFPPacketOut(
+                datapath=datapath, buffer_id=ofproto.OFP_NO_BUFFER,
+                in_port=ofproto.OFPP_CONTROLLER, actions=actions,
+                data=bytes(frame))
+            self._send_batched(datapath, out)
+            self.log_activity('debug', 'DISCOVERY: Probing for %s in %s',
+                              target_ip, subnet)
 
     @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
     def flow_stats_reply_handler(self, ev):
@@ -528,15 +790,21 @@ class L3RouterController(app_manager.RyuApp):
                 'instructions': str(stat.instructions)
             })
         dpid = ev.msg.datapath.id
-        self.flow_stats[dpid] = flows
+        with self._flow_stats_lock:
+            self.flow_stats[dpid] = flows
+            merged = []
+            for flow_list in self.flow_stats.values():
+                merged.extend(flow_list)
+            self._flow_stats_snapshot = _dumps(merged)
 
     def _collect_stats_periodically(self):
         """Collect flow and port statistics periodically"""
         while True:
-            for dpid, switch_info in self.switches.items():
-                datapath = switch_info['datapath']
-                self._request_stats(datapath)
-            time.sleep(10)
+            # Fire the whole burst of requests back to back, then sleep
+            # once; replies land asynchronously in the stats handler
+            for switch_info in list(self.switches.values()):
+                self._request_stats(switch_info['datapath'])
+            hub.sleep(10)
 
     def _request_stats(self, datapath):
         """Request flow statistics from switch"""
@@ -558,39 +826,36 @@ class L3RouterAPI(ControllerBase):
         """Health check endpoint"""
         try:
             response = {"message": "Hello from Ryu L3 Router Controller!"}
-            body = json.dumps(response).encode('utf-8')
+            body = _dumps(response)
             return Response(content_type='application/json; charset=utf-8', body=body)
         except Exception as e:
             error_response = {"error": str(e)}
-            body = json.dumps(error_response).encode('utf-8')
+            body = _dumps(error_response)
             return Response(status=500, content_type='application/json; charset=utf-8', body=body)
 
     @route('flows', '/flows', methods=['GET'])
     def get_flows(self, req, **kwargs):
-        """Get all flow statistics"""
-        flows = []
-        for dpid, flow_list in self.controller_app.flow_stats.items():
-            flows.extend(flow_list)
-        body = json.dumps(flows, indent=2).encode('utf-8')
-        return Response(content_type='application/json; charset=utf-8', body=body)
+        """Get all flow statistics (pre-serialized snapshot)"""
+        return Response(content_type='application/json; charset=utf-8',
+                        body=self.controller_app._flow_stats_snapshot)
 
     @route('activity', '/activity', methods=['GET'])
     def get_activity(self, req, **kwargs):
         """Get recent activity log"""
-        body = json.dumps(self.controller_app.activity_log, indent=2).encode('utf-8')
+        body = _dumps(list(self.controller_app.activity_log))
         return Response(content_type='application/json; charset=utf-8', body=body)
 
     @route('subnets', '/subnets', methods=['GET'])
     def get_subnets(self, req, **kwargs):
-        """Get subnet configuration"""
-        body = json.dumps(self.controller_app.subnet_gateways, indent=2).encode('utf-8')
-        return Response(content_type='application/json; charset=utf-8', body=body)
+        """Get subnet configuration (serialized once at startup)"""
+        return Response(content_type='application/json; charset=utf-8',
+                        body=self.controller_app._subnets_json)
 
     @route('routing_table', '/routing_table', methods=['GET'])
     def get_routing_table(self, req, **kwargs):
-        """Get routing table"""
-        body = json.dumps(self.controller_app.routing_table, indent=2).encode('utf-8')
-        return Response(content_type='application/json; charset=utf-8', body=body)
+        """Get routing table (serialized once at startup)"""
+        return Response(content_type='application/json; charset=utf-8',
+                        body=self.controller_app._routing_table_json)
 
     @route('stats', '/stats', methods=['GET'])
     def get_stats(self, req, **kwargs):
@@ -602,7 +867,7 @@ class L3RouterAPI(ControllerBase):
             'switches': len(self.controller_app.switches),
             'learned_ips': len(self.controller_app.ip_to_mac)
         }
-        body = json.dumps(stats, indent=2).encode('utf-8')
+        body = _dumps(stats)
         return Response(content_type='application/json; charset=utf-8', body=body)
 
 
@@ -3,6 +3,7 @@
 import subprocess
 import sys
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 def run_command(cmd, shell=True, check=True, capture_output=False):
     """Run a command and handle errors"""
@@ -47,38 +48,39 @@ def check_resource_exists(resource_type, resource_name):
     return False
 
 def stop_container(container_name):
-    """Stop a running container"""
+    """Stop a running container; returns (result, output lines).
+
+    Output is returned instead of printed so the caller can run several
+    stops in parallel without interleaving their messages.
+    """
     if not check_resource_exists("container", container_name):
-        print(f"   Container '{container_name}' does not exist - skipping stop")
-        return True
+        return True, [f"   Container '{container_name}' does not exist - skipping stop"]
 
     # Check if container is running
     is_running = run_command(f'podman ps -q -f name={container_name}', capture_output=True)
     if not is_running:
-        print(f"   Container '{container_name}' is not running - skipping stop")
-        return True
+        return True, [f"   Container '{container_name}' is not running - skipping stop"]
 
-    print(f"   Stopping container '{container_name}'...")
+    lines = [f"   Stopping container '{container_name}'..."]
     result = run_command(f'podman stop {container_name}', check=False)
     if result:
-        print(f"   Successfully stopped '{container_name}'")
+        lines.append(f"   Successfully stopped '{container_name}'")
     else:
-        print(f"   Warning: Failed to stop '{container_name}' (may already be stopped)")
-    return result
+        lines.append(f"   Warning: Failed to stop '{container_name}' (may already be stopped)")
+    return result, lines
 
 def remove_container(container_name):
-    """Remove a container"""
+    """Remove a container; returns (result, output lines)"""
     if not check_resource_exists("container", container_name):
-        print(f"   Container '{container_name}' does not exist - skipping removal")
-        return True
+        return True, [f"   Container '{container_name}' does not exist - skipping removal"]
 
-    print(f"   Removing container '{container_name}'...")
+    lines = [f"   Removing container '{container_name}'..."]
     result = run_command(f'podman rm -f {container_name}', check=False)
     if result:
-        print(f"   Successfully removed '{container_name}'")
+        lines.append(f"   Successfully removed '{container_name}'")
     else:
-        print(f"   Warning: Failed to remove '{container_name}'")
-    return result
+        lines.append(f"   Warning: Failed to remove '{container_name}'")
+    return result, lines
 
 def remove_network(network_name):
     """Remove a custom network"""
@@ -168,17 +170,22 @@ def remove_containers():
 
     containers = ['ukm_mininet', 'ukm_ryu']
 
+    # Each podman stop can block for its full grace period, so run the
+    # containers in parallel instead of back to back. The workers buffer
+    # their output and it is printed after they finish, in list order.
     # First stop all containers
     print("")
     print("Step 1: Stopping containers...")
-    for container in containers:
-        stop_container(container)
+    with ThreadPoolExecutor(max_workers=len(containers)) as executor:
+        for result, lines in executor.map(stop_container, containers):
+            print('\n'.join(lines))
 
     # Then remove all containers
     print("")
     print("Step 2: Removing containers...")
-    for container in containers:
-        remove_container(container)
+    with ThreadPoolExecutor(max_workers=len(containers)) as executor:
+        for result, lines in executor.map(remove_container, containers):
+            print('\n'.join(lines))
 
 def remove_ukmsdn_network():
     """Remove UKMSDN network"""
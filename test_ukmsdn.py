@@ -139,15 +139,25 @@ def setup_environment():
 
     # Step 3: Check if Ryu controller is running and get its IP
     print("3. Checking Ryu controller...")
-    cmd = 'podman exec ukm_ryu pgrep -f ryu-manager'
-    success, stdout, stderr = run_command(cmd)
-
-    if not success:
+    # One exec answers both questions (process alive, port listening) -
+    # every separate podman exec is a full container round-trip.
+    port_probe = 'netstat -tlnp 2>/dev/null | grep -q 6633 && echo PORT=1 || echo PORT=0'
+    probe = ('pgrep -f ryu-manager > /dev/null && echo PROC=1 || echo PROC=0; '
+             + port_probe)
+    success, stdout, stderr = run_command(f"podman exec ukm_ryu bash -c '{probe}'")
+    status = dict(line.split('=', 1) for line in stdout.split() if '=' in line)
+    ryu_running = success and status.get('PROC') == '1'
+    port_listening = status.get('PORT') == '1'
+
+    if not ryu_running:
         print("   ⚠️  Ryu controller not running. Starting it...")
         cmd = 'podman exec -d ukm_ryu bash -c "cd /opt/ukmsdn/ryu && ryu-manager ryu/app/simple_switch_13.py --verbose"'
         run_command(cmd)
         time.sleep(3)
         print("   ✅ Ryu controller started")
+        # Re-probe the port now that the controller had time to bind
+        success, stdout, stderr = run_command(f"podman exec ukm_ryu bash -c '{port_probe}'")
+        port_listening = success and 'PORT=1' in stdout
     else:
         print("   ✅ Ryu controller is running")
 
@@ -157,10 +167,7 @@ def setup_environment():
     if controller_ip:
         print(f"   📍 Controller IP: {controller_ip}")
 
-        # Verify controller is listening on port 6633
-        cmd = f'podman exec ukm_ryu netstat -tlnp | grep 6633'
-        success, stdout, stderr = run_command(cmd)
-        if success and "6633" in stdout:
+        if port_listening:
             print("   ✅ Controller listening on port 6633")
         else:
             print("   ⚠️  Controller may not be listening on port 6633")